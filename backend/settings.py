@@ -43,7 +43,6 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'rest_framework',
-    'rest_framework_simplejwt',
     'whitenoise.runserver_nostatic',
     'corsheaders'
 ]
@@ -55,6 +54,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.NotificationBatchMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'corsheaders.middleware.CorsMiddleware'
@@ -85,10 +85,18 @@ WSGI_APPLICATION = 'backend.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
 
-DATABASES = {
+# Configured from DATABASE_URL, see the bottom of this file
+DATABASES = {}
+
+# Cache
+# Defaults to per-process memory. Point CACHE_BACKEND/CACHE_LOCATION at a
+# shared cache (e.g. django.core.cache.backends.redis.RedisCache) when
+# running several workers so cached snapshots stay in step.
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'BACKEND': os.getenv("CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        'LOCATION': os.getenv("CACHE_LOCATION", ""),
     }
 }
 
@@ -141,22 +149,92 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'core.authentication.CachedJWTAuthentication',
     ),
 }
 
+# Notification retention, applied by `manage.py prune_notifications`
+NOTIFICATION_SEEN_RETENTION_DAYS = int(os.getenv("NOTIFICATION_SEEN_RETENTION_DAYS", "30"))
+NOTIFICATION_MAX_UNSEEN = int(os.getenv("NOTIFICATION_MAX_UNSEEN", "200"))
+
+# Pub/sub used to push new notifications to notifications/stream clients.
+# LocalBroker only reaches streams in the same process; use
+# core.events.PostgresBroker when running several workers on Postgres.
+NOTIFICATION_BROKER = os.getenv("NOTIFICATION_BROKER", "core.events.LocalBroker")
+
+# Under WSGI an open stream holds a request thread, so each process serves
+# at most this many at once; more are refused with 503
+NOTIFICATION_WSGI_STREAMS = int(os.getenv("NOTIFICATION_WSGI_STREAMS", "1"))
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days = 7),
     'REFRESH_TOKEN_LIFETIME': timedelta(days = 7),
-    'AUTH_HEADER_TYPES': ('Bearer')
+    'AUTH_HEADER_TYPES': ('Bearer'),
+    'TOKEN_OBTAIN_SERIALIZER': 'core.authentication.ClaimsTokenObtainPairSerializer',
 }
 
+# In-process cache of authenticated users, see core.authentication
+AUTH_USER_CACHE_SIZE = int(os.getenv("AUTH_USER_CACHE_SIZE", "1024"))
+AUTH_USER_CACHE_TTL = int(os.getenv("AUTH_USER_CACHE_TTL", "60"))
+
+# Serve the hot per-user reads from core.async_views; backend/asgi.py
+# turns this on, WSGI deployments keep the sync views
+ASYNC_READS = os.getenv("ASYNC_READS", "0") == "1"
+
+# Request threads per gunicorn worker, defaulting to DB_POOL_SIZE as in
+# gunicorn.conf.py
+REQUEST_THREADS = int(os.getenv("GUNICORN_THREADS", int(os.getenv("DB_POOL_SIZE", "4")) or 4))
+
+# Per-process login hashing pool. Logins beyond workers + queue are
+# refused with 429 rather than tying up the request workers. Every login
+# in the pool holds a request thread while it waits, so workers + queue
+# is capped to leave at least one thread free beside the WSGI streams.
+LOGIN_HASH_SLOTS = max(1, REQUEST_THREADS - 1 - NOTIFICATION_WSGI_STREAMS)
+LOGIN_HASH_WORKERS = min(int(os.getenv("LOGIN_HASH_WORKERS", "2")), LOGIN_HASH_SLOTS)
+LOGIN_HASH_QUEUE = min(int(os.getenv("LOGIN_HASH_QUEUE", "8")), LOGIN_HASH_SLOTS - LOGIN_HASH_WORKERS)
+LOGIN_HASH_TIMEOUT = float(os.getenv("LOGIN_HASH_TIMEOUT", "10"))
+
+# admin/users/import hashes every password inside the request, which has
+# to finish within the gunicorn timeout, so it takes small batches on at
+# most IMPORT_HASH_WORKERS processes; whole cohorts go through
+# `manage.py import_users` instead
+IMPORT_MAX_ROWS = int(os.getenv("IMPORT_MAX_ROWS", "50"))
+IMPORT_HASH_WORKERS = int(os.getenv("IMPORT_HASH_WORKERS", "1"))
+
 db_url = os.getenv("DATABASE_URL")
 if not db_url:
     raise Exception("DATABASE_URL is not set in environment")
-try:
-    parsed_db = dj_database_url.parse(db_url)
-    print("Parsed DB config:", parsed_db)
-except Exception as e:
-    print("dj_database_url parsing failed:", e)
-    raise
+
+# Postgres connections come from a per-process pool of DB_POOL_SIZE
+# (0 disables it); gunicorn.conf.py caps the workers so DB_POOL_SIZE *
+# workers stays within DB_MAX_CONNECTIONS. Pooled connections go back to the pool after
+# each request; without the pool they are kept for DB_CONN_MAX_AGE seconds.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "4"))
+DB_CONN_MAX_AGE = int(os.getenv("DB_CONN_MAX_AGE", "60"))
+
+parsed_db = dj_database_url.parse(db_url, conn_max_age = DB_CONN_MAX_AGE, conn_health_checks = True)
+if parsed_db['ENGINE'] == 'django.db.backends.postgresql' and DB_POOL_SIZE > 0:
+    parsed_db.update({
+        'ENGINE': 'core.db.postgresql',
+        'CONN_MAX_AGE': 0,
+        'POOL': {
+            'MAX_SIZE': DB_POOL_SIZE,
+            'TIMEOUT': float(os.getenv("DB_POOL_TIMEOUT", "10")),
+            'CHECK_AFTER': float(os.getenv("DB_POOL_CHECK_AFTER", "30")),
+            'MAX_LIFETIME': float(os.getenv("DB_POOL_MAX_LIFETIME", "1800")),
+        },
+    })
+
+# Opt-in profile for serving from the SQLite file: WAL, tuned pragmas and
+# serialized writes, see core.db.sqlite
+DB_SQLITE_PRODUCTION = os.getenv("DB_SQLITE_PRODUCTION", "0") == "1"
+if parsed_db['ENGINE'] == 'django.db.backends.sqlite3' and DB_SQLITE_PRODUCTION:
+    parsed_db.update({
+        'ENGINE': 'core.db.sqlite',
+        'PRAGMAS': {
+            'busy_timeout': int(os.getenv("DB_SQLITE_BUSY_TIMEOUT_MS", "5000")),
+            'mmap_size': int(os.getenv("DB_SQLITE_MMAP_MB", "256")) * 1024 * 1024,
+            'cache_size': -int(os.getenv("DB_SQLITE_CACHE_MB", "64")) * 1024,
+        },
+    })
+DATABASES['default'] = parsed_db
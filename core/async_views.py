@@ -0,0 +1,113 @@
+"""
+Native async versions of the hot per-user reads, built on the async ORM.
+
+backend/asgi.py routes the matching URLs here (settings.ASYNC_READS) so a
+slow client or query parks a coroutine instead of holding a worker
+thread. Responses match the sync views in views.py field for field.
+"""
+from functools import wraps
+
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework_simplejwt.exceptions import InvalidToken
+
+from .authentication import CachedJWTAuthentication
+from .models import Profile, Mentorship, Session
+from .serializers import NotificationParser, MentorshipReqSerializer, SessionSerializer
+from .views import PROFILE_NOTIFICATIONS, REQUEST_ORDERING, SESSION_ORDERING
+from . import etags, pagination
+
+class _JSON(JsonResponse):
+	# Same encoding as DRF's JSONRenderer, lists allowed at the top level
+	def __init__(self, data, status = 200):
+		super().__init__(data, encoder = JSONEncoder, safe = False, status = status)
+
+def _unauthorized(detail):
+	response = _JSON({"detail": detail}, status = 401)
+	response['WWW-Authenticate'] = 'Bearer realm="api"'
+	return response
+
+def authenticated(view):
+	"""Async counterpart of @api_view(['GET']) + IsAuthenticated for JWT clients."""
+	@require_GET
+	@wraps(view)
+	async def wrapped(request, *args, **kwargs):
+		header = request.headers.get('Authorization', '')
+		if not header.startswith('Bearer '):
+			return _unauthorized("Authentication credentials were not provided.")
+
+		try:
+			authenticator = CachedJWTAuthentication()
+			request.user = await authenticator.aget_user(authenticator.get_validated_token(header.split(' ', 1)[1]))
+		except (InvalidToken, AuthenticationFailed):
+			return _unauthorized("Given token not valid for any token type")
+
+		return await view(request, *args, **kwargs)
+
+	return wrapped
+
+async def _listing(request, queryset, ordering, serializer_class, key = None):
+	if pagination.requested(request):
+		try:
+			rows, next_cursor = await pagination.akeyset_page(
+				queryset, ordering, request.GET.get('cursor'), pagination.page_size_from(request)
+			)
+		except pagination.InvalidCursor as error:
+			return _JSON({"detail": str(error)}, status = 400)
+		return _JSON({"results": serializer_class(rows, many = True).data, "next": next_cursor})
+
+	# Every relation the serializer reads is select_related, so .data runs no queries
+	rows = [row async for row in queryset]
+	data = serializer_class(rows, many = True).data
+	return _JSON({key: data} if key else data)
+
+@authenticated
+async def GetUser(request):
+	return etags.content_response(request, {'username': request.user.username, 'role': request.user.profile.role}, _JSON)
+
+@authenticated
+@etags.user_etag
+async def GetProfile(request):
+	user = request.user
+	profile = await Profile.objects.aget(user = user)
+	latest = [n async for n in user.notifications.order_by('-date', '-id')[:PROFILE_NOTIFICATIONS]]
+
+	return _JSON({
+		'username': user.username, 'role': profile.role, 'bio': profile.bio, 'skills': profile.skills, 'goals': profile.goals,
+		'notifications': NotificationParser(latest, many = True).data, 'unread': profile.unread_notifications
+	})
+
+@authenticated
+@etags.user_etag
+async def GetMenteeRequests(request):
+	requests = request.user.mentee_request.select_related('mentee__profile', 'mentor')
+	return await _listing(request, requests, REQUEST_ORDERING, MentorshipReqSerializer)
+
+@authenticated
+@etags.user_etag
+async def GetMentorRequests(request):
+	requests = request.user.mentor_request.select_related('mentee__profile', 'mentor')
+	return await _listing(request, requests, REQUEST_ORDERING, MentorshipReqSerializer, key = 'requests')
+
+@authenticated
+@etags.user_etag
+async def GetMenteeSessions(request):
+	sessions = Session.objects.filter(mentorship__mentee = request.user).select_related('mentorship__mentee', 'mentorship__mentor')
+	return await _listing(request, sessions, SESSION_ORDERING, SessionSerializer, key = 'sessions')
+
+@authenticated
+@etags.user_etag
+async def GetMentorSessions(request):
+	sessions = Session.objects.filter(mentorship__mentor = request.user).select_related('mentorship__mentee', 'mentorship__mentor')
+	return await _listing(request, sessions, SESSION_ORDERING, SessionSerializer, key = 'sessions')
+
+@authenticated
+async def my_mentorships(request):
+	mentorships = Mentorship.objects.filter(mentee = request.user).select_related('mentor')
+	return _JSON([
+		{'id': m.id, 'mentor': m.mentor.id, 'mentor_username': m.mentor.username}
+		async for m in mentorships
+	])
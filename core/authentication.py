@@ -0,0 +1,160 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User, update_last_login
+
+from rest_framework.exceptions import AuthenticationFailed, Throttled
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.settings import api_settings
+
+from .hashing import HashPool, PoolSaturated, verify_password
+
+# Password checks for auth/login/ run here rather than on the request thread
+login_pool = HashPool(settings.LOGIN_HASH_WORKERS, settings.LOGIN_HASH_QUEUE, settings.LOGIN_HASH_TIMEOUT)
+
+def authenticate_pooled(username, password):
+    """
+    ModelBackend's check with the hashing done on login_pool. Raises
+    Throttled (429 with Retry-After) when the pool is saturated.
+    """
+    try:
+        user = User.objects.select_related('profile').filter(username = username).first()
+        if user is None:
+            # Hash anyway so unknown usernames take as long as wrong passwords
+            login_pool.run(make_password, password)
+            return None
+
+        matches, outdated = login_pool.run(verify_password, password, user.password)
+        if matches and outdated:
+            user.password = login_pool.run(make_password, password)
+            user.save(update_fields = ['password'])
+    except PoolSaturated as error:
+        raise Throttled(wait = error.retry_after, detail = "Too many logins in progress.")
+
+    return user if matches and user.is_active else None
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """
+    Issue tokens that also carry the user's profile id and role, checking
+    the password on the bounded login pool.
+    """
+
+    def validate(self, attrs):
+        self.user = authenticate_pooled(attrs[self.username_field], attrs['password'])
+        if not api_settings.USER_AUTHENTICATION_RULE(self.user):
+            raise AuthenticationFailed(self.error_messages['no_active_account'], 'no_active_account')
+
+        refresh = self.get_token(self.user)
+        if api_settings.UPDATE_LAST_LOGIN:
+            update_last_login(None, self.user)
+
+        return {'refresh': str(refresh), 'access': str(refresh.access_token)}
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        profile = getattr(user, 'profile', None)
+        if profile is not None:
+            token['profile_id'] = profile.id
+            token['role'] = profile.role
+        return token
+
+class UserCache:
+    """
+    Bounded, thread-safe LRU of authenticated users (with their profile)
+    whose entries expire after `ttl` seconds. Callers get copies so a
+    request can never mutate another request's user.
+    """
+
+    def __init__(self, size, ttl):
+        self.size = size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            expires, user = entry
+            if expires < time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+        return _copy_user(user)
+
+    def put(self, user):
+        with self._lock:
+            self._entries[user.pk] = (time.monotonic() + self.ttl, _copy_user(user))
+            self._entries.move_to_end(user.pk)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last = False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+def _copy_user(user):
+    # Model copies get their own field cache; copy the cached profile too
+    clone = copy.copy(user)
+    profile = user._state.fields_cache.get('profile')
+    if profile is not None:
+        clone._state.fields_cache['profile'] = copy.copy(profile)
+    return clone
+
+user_cache = UserCache(settings.AUTH_USER_CACHE_SIZE, settings.AUTH_USER_CACHE_TTL)
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that resolves the user from an in-process cache and
+    otherwise loads user and profile in one query. Entries are dropped
+    when the user or profile is saved, so role changes apply at once in
+    this process and within AUTH_USER_CACHE_TTL seconds everywhere else.
+    """
+
+    def get_user(self, validated_token):
+        user_id = _user_id(validated_token)
+        user = user_cache.get(user_id)
+        if user is None:
+            try:
+                user = User.objects.select_related('profile').get(**{api_settings.USER_ID_FIELD: user_id})
+            except User.DoesNotExist:
+                raise AuthenticationFailed("User not found", code = "user_not_found")
+            user_cache.put(user)
+
+        return _active(user)
+
+    async def aget_user(self, validated_token):
+        """get_user for async views, using the async ORM on a cache miss."""
+        user_id = _user_id(validated_token)
+        user = user_cache.get(user_id)
+        if user is None:
+            try:
+                user = await User.objects.select_related('profile').aget(**{api_settings.USER_ID_FIELD: user_id})
+            except User.DoesNotExist:
+                raise AuthenticationFailed("User not found", code = "user_not_found")
+            user_cache.put(user)
+
+        return _active(user)
+
+def _user_id(validated_token):
+    try:
+        return validated_token[api_settings.USER_ID_CLAIM]
+    except KeyError:
+        raise InvalidToken("Token contained no recognizable user identification")
+
+def _active(user):
+    if not user.is_active:
+        raise AuthenticationFailed("User is inactive", code = "user_inactive")
+    return user
@@ -0,0 +1,174 @@
+import os
+import threading
+import time
+from collections import deque
+
+_pools = {}
+_registry_lock = threading.Lock()
+
+class PoolTimeout(Exception):
+    pass
+
+def register(alias, create):
+    """The pool for a database alias, made with create() on first use."""
+    pool = _pools.get(alias)
+    if pool is None:
+        with _registry_lock:
+            pool = _pools.get(alias)
+            if pool is None:
+                pool = _pools[alias] = create()
+    return pool
+
+def pools():
+    """This process's pools by database alias."""
+    return dict(_pools)
+
+class ConnectionPool:
+    """
+    Process-local pool of at most `max_size` DB-API connections.
+
+    Checkout hands back the most recently returned idle connection. A
+    connection that sat idle longer than `check_after` seconds is tested
+    with `check` first, and one older than `max_lifetime` is replaced, so
+    dead or stale server connections never reach a request. When every
+    connection is in use, callers wait up to `timeout` seconds and then get
+    PoolTimeout. After a fork the child drops the connections it inherited
+    instead of sharing their sockets with the parent.
+    """
+
+    def __init__(self, connect, max_size, timeout = 10, check_after = 30, max_lifetime = 1800,
+                 check = None, reset = None):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.check_after = check_after
+        self.max_lifetime = max_lifetime
+        self._connect = connect
+        self._check = check or (lambda connection: True)
+        self._reset = reset or (lambda connection: None)
+        self._cond = threading.Condition()
+        self._pid = os.getpid()
+        self._idle = deque()
+        self._born = {}
+        self._size = 0
+        self._waiting = 0
+        self._stats = dict.fromkeys(('acquired', 'created', 'discarded', 'failed_checks', 'timeouts'), 0)
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def _after_fork(self):
+        # Caller holds the lock. The parent still owns these sockets.
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._idle.clear()
+            self._born.clear()
+            self._size = 0
+
+    def acquire(self, connect = None):
+        """Check out a connection, opening a new one with `connect` if allowed."""
+        started = time.monotonic()
+        with self._cond:
+            self._after_fork()
+            while not self._idle and self._size >= self.max_size:
+                remaining = started + self.timeout - time.monotonic()
+                if remaining <= 0:
+                    self._stats['timeouts'] += 1
+                    raise PoolTimeout(f"No database connection free within {self.timeout}s ({self.max_size} in use)")
+                self._waiting += 1
+                self._cond.wait(remaining)
+                self._waiting -= 1
+
+            entry = self._idle.pop() if self._idle else None
+            if entry is None:
+                self._size += 1
+            waited = time.monotonic() - started
+            self._stats['acquired'] += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+
+        if entry is not None:
+            connection, returned = entry
+            now = time.monotonic()
+            if now - self._born[id(connection)] > self.max_lifetime:
+                self._close(connection)
+            elif now - returned > self.check_after and not self._check(connection):
+                with self._cond:
+                    self._stats['failed_checks'] += 1
+                self._close(connection)
+            else:
+                return connection
+
+        try:
+            connection = (connect or self._connect)()
+        except BaseException:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+        with self._cond:
+            self._born[id(connection)] = time.monotonic()
+            self._stats['created'] += 1
+        return connection
+
+    def release(self, connection, discard = False):
+        """Return a connection; broken or discarded ones are closed instead."""
+        with self._cond:
+            if self._pid != os.getpid() or id(connection) not in self._born:
+                return
+
+        if not discard:
+            try:
+                self._reset(connection)
+            except Exception:
+                discard = True
+
+        with self._cond:
+            if discard:
+                self._size -= 1
+                self._stats['discarded'] += 1
+                self._born.pop(id(connection), None)
+            else:
+                self._idle.append((connection, time.monotonic()))
+            self._cond.notify()
+
+        if discard:
+            _close_quietly(connection)
+
+    def _close(self, connection):
+        # Retire a checked-out connection whose slot the caller reuses
+        with self._cond:
+            self._born.pop(id(connection), None)
+            self._stats['discarded'] += 1
+        _close_quietly(connection)
+
+    def close_all(self):
+        """Close every idle connection, e.g. in a master process before forking."""
+        with self._cond:
+            self._after_fork()
+            idle = [connection for connection, _ in self._idle]
+            self._idle.clear()
+            for connection in idle:
+                self._born.pop(id(connection), None)
+            self._size -= len(idle)
+        for connection in idle:
+            _close_quietly(connection)
+
+    def metrics(self):
+        with self._cond:
+            acquired = self._stats['acquired']
+            return {
+                'max_size': self.max_size,
+                'size': self._size,
+                'idle': len(self._idle),
+                'in_use': self._size - len(self._idle),
+                'waiting': self._waiting,
+                **self._stats,
+                'wait_mean': round(self._wait_total / acquired, 4) if acquired else 0.0,
+                'wait_max': round(self._wait_max, 4),
+            }
+
+def _close_quietly(connection):
+    try:
+        connection.close()
+    except Exception:
+        pass
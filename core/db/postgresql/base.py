@@ -0,0 +1,54 @@
+"""
+PostgreSQL backend whose connections come from a process-local pool.
+
+Use with CONN_MAX_AGE = 0: Django then "closes" the connection after every
+request, which hands it back to the pool instead of tearing it down.
+Pool options live under the POOL key of the DATABASES entry.
+"""
+from django.db.backends.postgresql import base
+
+from ..pool import ConnectionPool, PoolTimeout, register
+
+# TRANSACTION_STATUS_IDLE in psycopg2, TransactionStatus.IDLE in psycopg 3
+IDLE = 0
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def _pool(self):
+        options = self.settings_dict.get('POOL', {})
+        return register(self.alias, lambda: ConnectionPool(
+            connect = None,
+            max_size = options.get('MAX_SIZE', 4),
+            timeout = options.get('TIMEOUT', 10),
+            check_after = options.get('CHECK_AFTER', 30),
+            max_lifetime = options.get('MAX_LIFETIME', 1800),
+            check = _is_usable,
+            reset = _reset,
+        ))
+
+    def get_new_connection(self, conn_params):
+        parent = super().get_new_connection
+        try:
+            return self._pool().acquire(lambda: parent(conn_params))
+        except PoolTimeout as error:
+            raise self.Database.OperationalError(str(error)) from error
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                self._pool().release(self.connection, discard = bool(self.connection.closed))
+
+def _is_usable(connection):
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+    except base.Database.Error:
+        return False
+    return True
+
+def _reset(connection):
+    # Never hand out a connection mid-transaction
+    if connection.closed:
+        raise base.Database.InterfaceError("connection already closed")
+    if connection.info.transaction_status != IDLE:
+        connection.rollback()
@@ -0,0 +1,114 @@
+"""
+SQLite backend for serving production traffic from a single database file.
+
+Every new connection switches to WAL journaling, so readers never block the
+writer or each other, and applies the pragmas under the PRAGMAS key of the
+DATABASES entry. Writes are serialized: atomic() opens its transaction with
+BEGIN IMMEDIATE, taking SQLite's write lock up front instead of failing with
+"database is locked" when a read transaction later tries to upgrade, and the
+threads of one process queue for a per-file writer lock rather than spinning
+in SQLite's busy handler. Writes outside atomic() take the lock per statement.
+"""
+import re
+import threading
+
+from django.db.backends.sqlite3 import base
+
+PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'mmap_size': 256 * 1024 * 1024,
+    # Negative sizes are KiB
+    'cache_size': -64 * 1024,
+    'temp_store': 'MEMORY',
+}
+
+WRITE = re.compile(r'\s*(INSERT|UPDATE|DELETE|REPLACE|CREATE|DROP|ALTER)\b', re.IGNORECASE)
+
+_writers = {}
+_writers_lock = threading.Lock()
+
+def writer_lock(name):
+    """The lock serializing this process's writes to database file `name`."""
+    with _writers_lock:
+        return _writers.setdefault(name, threading.Lock())
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pragmas = {**PRAGMAS, **self.settings_dict.get('PRAGMAS', {})}
+        self.writer = writer_lock(self.settings_dict['NAME'])
+        self.holds_writer = False
+
+    def get_new_connection(self, conn_params):
+        connection = super().get_new_connection(conn_params)
+        for pragma, value in self.pragmas.items():
+            connection.execute(f"PRAGMA {pragma} = {value}")
+        return connection
+
+    def create_cursor(self, name = None):
+        return self.connection.cursor(factory = lambda connection: WriterCursor(connection, self))
+
+    def acquire_writer(self):
+        if not self.writer.acquire(timeout = self.pragmas['busy_timeout'] / 1000):
+            raise base.Database.OperationalError("database is locked")
+
+    def _start_transaction_under_autocommit(self):
+        with self.wrap_database_errors:
+            self.acquire_writer()
+        self.holds_writer = True
+        try:
+            self.cursor().execute("BEGIN IMMEDIATE")
+        except BaseException:
+            self._release_writer()
+            raise
+
+    def _release_writer(self):
+        if self.holds_writer and not (self.connection and self.connection.in_transaction):
+            self.holds_writer = False
+            self.writer.release()
+
+    def _commit(self):
+        try:
+            super()._commit()
+        finally:
+            self._release_writer()
+
+    def _rollback(self):
+        try:
+            super()._rollback()
+        finally:
+            self._release_writer()
+
+    def _close(self):
+        try:
+            super()._close()
+        finally:
+            # Closing abandons any open transaction
+            if self.holds_writer:
+                self.holds_writer = False
+                self.writer.release()
+
+class WriterCursor(base.SQLiteCursorWrapper):
+    """Takes the writer lock around writes issued outside a transaction."""
+
+    def __init__(self, connection, wrapper):
+        super().__init__(connection)
+        self.wrapper = wrapper
+
+    def _serialized(self, run, query, params):
+        if self.connection.in_transaction or not WRITE.match(query):
+            return run(query, params)
+        self.wrapper.acquire_writer()
+        try:
+            return run(query, params)
+        finally:
+            self.wrapper.writer.release()
+
+    def execute(self, query, params = None):
+        return self._serialized(super().execute, query, params)
+
+    def executemany(self, query, param_list):
+        return self._serialized(super().executemany, query, param_list)
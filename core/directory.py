@@ -0,0 +1,104 @@
+import json
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Profile
+
+CACHE_KEY = 'mentor_directory'
+VERSION_KEY = 'mentor_directory:version'
+# A snapshot is rebuilt this long after it was built, however often it is
+# patched since, which bounds how far a process's copy can lag behind
+# when the cache backend is not shared between workers
+CACHE_TIMEOUT = 300
+
+FIELDS = ('id', 'username', 'bio', 'skills', 'goals')
+
+def _entry(profile):
+    return {
+        'id': profile.id,
+        'username': profile.user.username,
+        'bio': profile.bio,
+        'skills': profile.skills,
+        'goals': profile.goals,
+    }
+
+def _version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, 0, None)
+        version = cache.get(VERSION_KEY, 0)
+    return version
+
+def _bump():
+    """Count one committed change and return its version."""
+    try:
+        return cache.incr(VERSION_KEY)
+    except ValueError:
+        # The counter was evicted, so older snapshots can't be trusted
+        cache.delete(CACHE_KEY)
+        cache.add(VERSION_KEY, 0, None)
+        return cache.incr(VERSION_KEY)
+
+def _store(entries, version, expires):
+    """
+    Cache a snapshot tagged with the last change it includes. It expires
+    at `expires` no matter how often it is patched before then.
+    """
+    ordered = sorted(entries.values(), key = lambda entry: (entry['username'], entry['id']))
+    snapshot = {'entries': entries, 'body': json.dumps(ordered).encode(), 'version': version, 'expires': expires}
+    cache.set(CACHE_KEY, snapshot, max(1, expires - time.time()))
+    return snapshot
+
+def rebuild():
+    # Read the version first: changes committed during the query bump it
+    # past this snapshot's tag, so readers rebuild again rather than miss them
+    version = _version()
+    mentors = Profile.objects.filter(role = 'mentor').values_list('id', 'user__username', 'bio', 'skills', 'goals')
+    return _store({row[0]: dict(zip(FIELDS, row)) for row in mentors}, version, time.time() + CACHE_TIMEOUT)
+
+def _current():
+    """The cached snapshot if it includes every counted change, else None."""
+    cached = cache.get_many([CACHE_KEY, VERSION_KEY])
+    snapshot = cached.get(CACHE_KEY)
+    if snapshot is None or snapshot['version'] != cached.get(VERSION_KEY) or snapshot['expires'] <= time.time():
+        return None
+    return snapshot
+
+def snapshot_body():
+    """JSON list of every mentor's public profile, served from the cache."""
+    snapshot = _current()
+    if snapshot is None:
+        snapshot = rebuild()
+    return snapshot['body']
+
+def _apply(profile_id, entry):
+    snapshot = cache.get(CACHE_KEY)
+    if snapshot is not None and snapshot['entries'].get(profile_id) == entry:
+        return
+
+    version = _bump()
+    if snapshot is None:
+        # Nothing cached yet; the next read rebuilds from the table
+        return
+    if snapshot['version'] != version - 1:
+        # Another change is being patched in concurrently; patching on top of
+        # a snapshot without it would lose it, so leave it to a rebuild
+        cache.delete(CACHE_KEY)
+        return
+
+    entries = snapshot['entries']
+    if entry is None:
+        entries.pop(profile_id, None)
+    else:
+        entries[profile_id] = entry
+    _store(entries, version, snapshot['expires'])
+
+def profile_changed(profile):
+    """Patch the snapshot for one profile once the change has committed."""
+    entry = _entry(profile) if profile.role == 'mentor' else None
+    transaction.on_commit(lambda: _apply(profile.id, entry))
+
+def profile_deleted(profile):
+    transaction.on_commit(lambda: _apply(profile.id, None))
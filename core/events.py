@@ -0,0 +1,120 @@
+import asyncio
+import json
+import queue
+import threading
+
+from django.conf import settings
+from django.db import connection
+from django.utils.module_loading import import_string
+
+QUEUE_SIZE = 100
+
+class LocalBroker:
+    """
+    In-process pub/sub. Each connected stream owns a bounded queue: an
+    asyncio queue fed through its event loop, or for streams served by a
+    WSGI worker thread a thread-safe queue.Queue.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = {}
+
+    def subscribe(self, user_id, blocking = False):
+        if blocking:
+            loop, subscription = None, queue.Queue(maxsize = QUEUE_SIZE)
+        else:
+            loop, subscription = asyncio.get_running_loop(), asyncio.Queue(maxsize = QUEUE_SIZE)
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add((loop, subscription))
+        return subscription
+
+    def unsubscribe(self, user_id, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(user_id, set())
+            subscribers.difference_update({entry for entry in subscribers if entry[1] is subscription})
+            if not subscribers:
+                self._subscribers.pop(user_id, None)
+
+    def publish(self, user_id, message):
+        self.deliver(user_id, message)
+
+    def deliver(self, user_id, message):
+        with self._lock:
+            targets = list(self._subscribers.get(user_id, ()))
+        for loop, subscription in targets:
+            if loop is None:
+                _put(subscription, message)
+            else:
+                loop.call_soon_threadsafe(_put, subscription, message)
+
+    def subscriber_count(self):
+        with self._lock:
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+def _put(subscription, message):
+    # A client too slow to drain its queue loses messages rather than memory
+    try:
+        subscription.put_nowait(message)
+    except (asyncio.QueueFull, queue.Full):
+        pass
+
+class PostgresBroker(LocalBroker):
+    """
+    Fan out across worker processes with LISTEN/NOTIFY. Publishing sends a
+    NOTIFY on the request's connection; one listener thread per process
+    receives them and delivers to that process's local subscribers.
+    """
+
+    channel = 'core_notifications'
+
+    def __init__(self):
+        super().__init__()
+        self._listener = None
+
+    def subscribe(self, user_id, blocking = False):
+        self._ensure_listener()
+        return super().subscribe(user_id, blocking)
+
+    def publish(self, user_id, message):
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_notify(%s, %s)', [self.channel, json.dumps([user_id, message])])
+
+    def _ensure_listener(self):
+        with self._lock:
+            if self._listener is None:
+                self._listener = threading.Thread(target = self._listen, daemon = True)
+                self._listener.start()
+
+    def _listen(self):
+        import select
+        import time
+        import psycopg2
+
+        while True:
+            try:
+                listener = psycopg2.connect(**connection.get_connection_params())
+                listener.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                listener.cursor().execute(f'LISTEN {self.channel}')
+
+                while True:
+                    if select.select([listener], [], [], 30) == ([], [], []):
+                        continue
+                    listener.poll()
+                    while listener.notifies:
+                        user_id, message = json.loads(listener.notifies.pop(0).payload)
+                        self.deliver(user_id, message)
+
+            except psycopg2.Error:
+                # Reconnect after a short pause if the listening connection drops
+                time.sleep(1)
+
+_broker = None
+_broker_lock = threading.Lock()
+
+def get_broker():
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            _broker = import_string(settings.NOTIFICATION_BROKER)()
+        return _broker
@@ -0,0 +1,66 @@
+import csv
+import json
+
+from django.contrib.auth.models import User
+
+from .models import Session
+
+CHUNK_SIZE = 2000
+
+# Export name -> (row source, [(column name, lookup)])
+EXPORTS = {
+    'users': (
+        lambda: User.objects.order_by('id'),
+        [
+            ('id', 'id'),
+            ('profile_id', 'profile__id'),
+            ('username', 'username'),
+            ('email', 'email'),
+            ('role', 'profile__role'),
+            ('date_joined', 'date_joined'),
+        ],
+    ),
+    'sessions': (
+        lambda: Session.objects.order_by('date', 'id'),
+        [
+            ('id', 'id'),
+            ('mentorship', 'mentorship_id'),
+            ('mentee', 'mentorship__mentee__username'),
+            ('mentor', 'mentorship__mentor__username'),
+            ('date', 'date'),
+            ('start', 'start'),
+            ('end', 'end'),
+            ('feedback', 'feedback'),
+            ('rating', 'rating'),
+        ],
+    ),
+}
+
+CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+class _Echo:
+    # csv.writer only needs write(); hand each formatted line straight back
+    def write(self, value):
+        return value
+
+def _rows(name):
+    source, columns = EXPORTS[name]
+    lookups = [lookup for _, lookup in columns]
+    return source().values_list(*lookups).iterator(chunk_size = CHUNK_SIZE)
+
+def stream(name, fmt):
+    """Yield the export line by line, holding at most one chunk of rows."""
+    names = [column for column, _ in EXPORTS[name][1]]
+
+    if fmt == 'csv':
+        writer = csv.writer(_Echo())
+        yield writer.writerow(names)
+        for row in _rows(name):
+            yield writer.writerow(['' if value is None else value for value in row])
+
+    else:
+        for row in _rows(name):
+            yield json.dumps(dict(zip(names, row)), default = str) + '\n'
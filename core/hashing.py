@@ -0,0 +1,129 @@
+import math
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, TimeoutError as FuturesTimeout
+
+import django
+from django.contrib.auth.hashers import check_password, make_password
+
+# Kept free of model imports so pool workers can load it before Django is set up
+
+def _init_worker(settings_module):
+    # Forked workers inherit configured settings; spawned ones start cold
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    django.setup()
+
+def hash_passwords(passwords, workers = None):
+    """
+    Hash every password with the configured hasher, spreading the work over
+    a process pool of `workers` (default: every core). Order is preserved.
+    """
+    passwords = list(passwords)
+    workers = min(workers or os.cpu_count() or 1, len(passwords))
+    if workers <= 1:
+        return [make_password(password) for password in passwords]
+
+    chunksize = max(1, len(passwords) // (workers * 4))
+    with ProcessPoolExecutor(
+        max_workers = workers,
+        initializer = _init_worker,
+        initargs = (os.environ.get('DJANGO_SETTINGS_MODULE', 'backend.settings'),)
+    ) as pool:
+        return list(pool.map(make_password, passwords, chunksize = chunksize))
+
+def verify_password(password, encoded):
+    """(matches, needs rehash) for a raw password against a stored hash."""
+    outdated = []
+    matches = check_password(password, encoded, setter = outdated.append)
+    return matches, bool(outdated)
+
+class PoolSaturated(Exception):
+    def __init__(self, retry_after):
+        super().__init__(f"Hash pool saturated, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+class HashPool:
+    """
+    A fixed set of hashing threads with room for at most `queue_size`
+    waiting jobs. PBKDF2 runs in C without the GIL, so the threads hash in
+    parallel while callers wait; once every worker and queue slot is taken
+    new jobs are refused at once instead of piling up behind the others.
+    """
+
+    def __init__(self, workers, queue_size, timeout = 10, window = 1000):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+        self._executor = ThreadPoolExecutor(max_workers = workers, thread_name_prefix = 'password-hash')
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen = window)
+        self._in_flight = 0
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+
+    def run(self, fn, *args):
+        """Run fn(*args) on the pool and return its result, or raise PoolSaturated."""
+        if not self._slots.acquire(blocking = False):
+            with self._lock:
+                self._rejected += 1
+            raise PoolSaturated(self.retry_after())
+
+        with self._lock:
+            self._in_flight += 1
+        future = self._executor.submit(self._timed, fn, args)
+        try:
+            return future.result(self.timeout)
+        except FuturesTimeout:
+            # The job keeps its slot until it finishes; just stop waiting
+            raise PoolSaturated(self.retry_after())
+
+    def _timed(self, fn, args):
+        with self._lock:
+            self._running += 1
+        started = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self._running -= 1
+                self._in_flight -= 1
+                self._completed += 1
+                self._latencies.append(elapsed)
+            self._slots.release()
+
+    def _mean_latency(self):
+        return sum(self._latencies) / len(self._latencies) if self._latencies else 0.0
+
+    def retry_after(self):
+        """Seconds until the current backlog should have drained, at least 1."""
+        with self._lock:
+            backlog, mean = self._in_flight, self._mean_latency()
+        return max(1, math.ceil(backlog * mean / self.workers))
+
+    def metrics(self):
+        with self._lock:
+            latencies = sorted(self._latencies)
+            in_flight, running = self._in_flight, self._running
+            completed, rejected = self._completed, self._rejected
+            mean = self._mean_latency()
+
+        def percentile(q):
+            return latencies[min(len(latencies) - 1, int(q * len(latencies)))] if latencies else 0.0
+
+        return {
+            'workers': self.workers,
+            'queue_size': self.queue_size,
+            'running': running,
+            'queue_depth': in_flight - running,
+            'completed': completed,
+            'rejected': rejected,
+            'latency_mean': round(mean, 4),
+            'latency_p50': round(percentile(0.5), 4),
+            'latency_p95': round(percentile(0.95), 4),
+            'latency_max': round(latencies[-1], 4) if latencies else 0.0,
+        }
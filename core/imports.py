@@ -0,0 +1,115 @@
+import csv
+import io
+import json
+
+from django.contrib.auth.models import User
+from django.contrib.auth.validators import UnicodeUsernameValidator
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+
+from .models import Profile
+from .notifications import notify
+from . import hashing, search, directory, notifications
+
+FIELDS = ('username', 'email', 'password', 'role')
+ROLES = {value for value, _ in Profile.roles}
+BATCH_SIZE = 1000
+
+_username_validator = UnicodeUsernameValidator()
+
+class InvalidImport(ValueError):
+    def __init__(self, errors):
+        super().__init__(f"{len(errors)} invalid rows")
+        self.errors = errors
+
+def rows_from_csv(text):
+    if isinstance(text, bytes):
+        text = text.decode('utf-8-sig')
+    return [{field: (row.get(field) or '').strip() for field in FIELDS} for row in csv.DictReader(io.StringIO(text))]
+
+def rows_from_json(data):
+    """Accept either a list of user objects or {"users": [...]}."""
+    if isinstance(data, (bytes, str)):
+        data = json.loads(data)
+    if isinstance(data, dict):
+        data = data.get('users')
+    if not isinstance(data, list) or not all(isinstance(row, dict) for row in data):
+        raise InvalidImport([{'row': None, 'detail': "Expected a list of user objects."}])
+    return [{field: str(row.get(field) or '').strip() for field in FIELDS} for row in data]
+
+def load(raw, fmt):
+    return rows_from_csv(raw) if fmt == 'csv' else rows_from_json(raw)
+
+def validate(rows):
+    """Per-row errors, checked in memory plus one username lookup per batch."""
+    errors = []
+    seen = set()
+    for number, row in enumerate(rows, start = 1):
+        problems = []
+        if not row['username'] or len(row['username']) > 150:
+            problems.append("username must be 1-150 characters")
+        elif not _username_validator.regex.match(row['username']):
+            problems.append("invalid username")
+        elif row['username'] in seen:
+            problems.append("duplicate username in file")
+        seen.add(row['username'])
+
+        if row['email']:
+            try:
+                validate_email(row['email'])
+            except ValidationError:
+                problems.append("invalid email")
+        if not row['password']:
+            problems.append("password is required")
+        if row['role'] not in ROLES:
+            problems.append(f"role must be one of {', '.join(sorted(ROLES))}")
+
+        if problems:
+            errors.append({'row': number, 'detail': '; '.join(problems)})
+
+    usernames = [row['username'] for row in rows]
+    taken = set()
+    for start in range(0, len(usernames), BATCH_SIZE):
+        taken.update(User.objects.filter(username__in = usernames[start:start + BATCH_SIZE]).values_list('username', flat = True))
+    for number, row in enumerate(rows, start = 1):
+        if row['username'] in taken:
+            errors.append({'row': number, 'detail': "username already exists"})
+
+    return sorted(errors, key = lambda error: error['row'])
+
+def import_users(rows, admin = None, workers = None, batch_size = BATCH_SIZE):
+    """
+    Create a user, profile and welcome notification for every row, all or
+    nothing. Passwords are hashed across a process pool before the
+    transaction opens so it only spans the batched inserts.
+    """
+    if not rows:
+        return []
+
+    errors = validate(rows)
+    if errors:
+        raise InvalidImport(errors)
+
+    hashes = hashing.hash_passwords([row['password'] for row in rows], workers)
+
+    with transaction.atomic(), notifications.batch():
+        users = User.objects.bulk_create([
+            User(username = row['username'], email = row['email'], password = hashed, is_superuser = row['role'] == 'admin')
+            for row, hashed in zip(rows, hashes)
+        ], batch_size = batch_size)
+
+        # bulk_create skips the post_save signals, so index and notify here
+        profiles = Profile.objects.bulk_create([
+            Profile(user = user, role = row['role']) for user, row in zip(users, rows)
+        ], batch_size = batch_size)
+        search.index_profiles(profiles)
+        if any(profile.role == 'mentor' for profile in profiles):
+            transaction.on_commit(directory.rebuild)
+
+        for user in users:
+            notify(user, "The admin user has added your user")
+        if admin is not None:
+            notify(admin, f"You added {len(users)} users")
+
+    return users
@@ -0,0 +1,135 @@
+import asyncio
+import time
+from datetime import date, timedelta
+from urllib.parse import urlsplit
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core.authentication import ClaimsTokenObtainPairSerializer
+from core.models import Profile, MentorshipRequest, Mentorship, Session
+
+HOT_PATHS = [
+    '/auth/me',
+    '/users/me',
+    '/requests/sent/',
+    '/requests/received/',
+    '/sessions/mentee',
+    '/sessions/mentor',
+    '/mentorships/my',
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test the hot read endpoints on one or more running servers and "
+        "report throughput and latency percentiles, e.g. a gunicorn WSGI and "
+        "a uvicorn ASGI server started against the same database"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('targets', nargs = '+', help = "name=http://host:port, e.g. wsgi=http://127.0.0.1:8000")
+        parser.add_argument('--paths', nargs = '+', default = HOT_PATHS)
+        parser.add_argument('--concurrency', type = int, default = 100)
+        parser.add_argument('--requests', type = int, default = 2000, help = "Requests per path per target")
+        parser.add_argument('--rows', type = int, default = 200, help = "Requests and sessions to seed for the benchmark users")
+
+    def handle(self, *args, **options):
+        targets = []
+        for target in options['targets']:
+            name, _, url = target.partition('=')
+            parts = urlsplit(url)
+            if not parts.hostname:
+                raise CommandError(f"Expected name=http://host:port, got {target!r}")
+            targets.append((name, parts.hostname, parts.port or 80))
+
+        mentee, mentor = _seed(options['rows'])
+        tokens = {
+            path: str(ClaimsTokenObtainPairSerializer.get_token(mentor if path in ('/requests/received/', '/sessions/mentor') else mentee).access_token)
+            for path in options['paths']
+        }
+
+        self.stdout.write(f"{'target':<10} {'path':<22} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8} {'errors':>7}")
+        for name, host, port in targets:
+            for path in options['paths']:
+                elapsed, latencies, errors = asyncio.run(
+                    _load(host, port, path, tokens[path], options['requests'], options['concurrency'])
+                )
+                latencies.sort()
+                self.stdout.write(
+                    f"{name:<10} {path:<22} {len(latencies) / elapsed:>9.1f} "
+                    f"{_percentile(latencies, 0.50):>8.1f} {_percentile(latencies, 0.95):>8.1f} "
+                    f"{_percentile(latencies, 0.99):>8.1f} {latencies[-1] * 1000:>8.1f} {errors:>7}"
+                )
+
+def _seed(rows):
+    """Give a benchmark mentee and mentor `rows` requests and sessions each way."""
+    with transaction.atomic():
+        users = []
+        for username, role in (('bench-mentee', 'mentee'), ('bench-mentor', 'mentor')):
+            user, _ = User.objects.get_or_create(username = username)
+            Profile.objects.get_or_create(user = user, defaults = {'role': role})
+            users.append(user)
+        mentee, mentor = users
+
+        mentorship, _ = Mentorship.objects.get_or_create(mentee = mentee, mentor = mentor)
+
+        # Only one request per pair can be pending, so each one goes to or
+        # comes from a different counterpart
+        others = []
+        for n in range(rows):
+            other, created = User.objects.get_or_create(username = f'bench-user-{n}')
+            if created:
+                Profile.objects.create(user = other, role = 'mentee')
+            others.append(other)
+        MentorshipRequest.objects.bulk_create(
+            [MentorshipRequest(mentee = mentee, mentor = other, status = 'pending') for other in others]
+            + [MentorshipRequest(mentee = other, mentor = mentor, status = 'pending') for other in others],
+            ignore_conflicts = True
+        )
+        sessions = Session.objects.filter(mentorship = mentorship).count()
+        Session.objects.bulk_create([
+            Session(mentorship = mentorship, date = date.today() + timedelta(days = day)) for day in range(sessions, rows)
+        ])
+    return mentee, mentor
+
+async def _get(host, port, path, token):
+    """One request on a fresh connection; returns (seconds, status code)."""
+    started = time.perf_counter()
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(
+        f"GET {path} HTTP/1.1\r\nHost: {host}\r\nAuthorization: Bearer {token}\r\nConnection: close\r\n\r\n".encode()
+    )
+    await writer.drain()
+    status_line = await reader.readline()
+    while await reader.read(65536):
+        pass
+    writer.close()
+    return time.perf_counter() - started, int(status_line.split()[1]) if status_line else 0
+
+async def _load(host, port, path, token, count, concurrency):
+    latencies = []
+    errors = 0
+    remaining = iter(range(count))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            try:
+                elapsed, status = await _get(host, port, path, token)
+            except OSError:
+                errors += 1
+                continue
+            latencies.append(elapsed)
+            if status != 200:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    if not latencies:
+        raise CommandError(f"No responses from {host}:{port}")
+    return time.perf_counter() - started, latencies, errors
+
+def _percentile(latencies, q):
+    return latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000
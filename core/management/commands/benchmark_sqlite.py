@@ -0,0 +1,121 @@
+import os
+import random
+import tempfile
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, connections, transaction
+from django.db.utils import load_backend
+
+ALIAS = 'sqlite-benchmark'
+
+PROFILES = {
+    'default': 'django.db.backends.sqlite3',
+    'production': 'core.db.sqlite',
+}
+
+SCHEMA = [
+    "CREATE TABLE notification (id INTEGER PRIMARY KEY, user_id INTEGER, kind TEXT, count INTEGER, seen INTEGER)",
+    "CREATE INDEX notification_user_seen ON notification (user_id, seen)",
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Run concurrent readers and writers against a scratch SQLite file, once "
+        "with Django's default SQLite backend and once with the production "
+        "profile from core.db.sqlite, and compare throughput, write latency and "
+        "errors such as 'database is locked'. Writers coalesce notifications "
+        "like core.notifications: read the unseen row, then update or insert."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type = int, default = 8)
+        parser.add_argument('--writers', type = int, default = 8)
+        parser.add_argument('--seconds', type = float, default = 5)
+        parser.add_argument('--users', type = int, default = 50)
+        parser.add_argument('--profile', dest = 'profiles', action = 'append', choices = sorted(PROFILES))
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'profile':<12} {'reads/s':>9} {'writes/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} {'errors':>7}")
+        for profile in options['profiles'] or ['default', 'production']:
+            with tempfile.TemporaryDirectory() as directory:
+                settings_dict = _settings(PROFILES[profile], os.path.join(directory, 'benchmark.sqlite3'))
+                reads, writes, errors = _run(settings_dict, options['readers'], options['writers'], options['seconds'], options['users'])
+
+            writes.sort()
+            self.stdout.write(
+                f"{profile:<12} {reads / options['seconds']:>9.1f} {len(writes) / options['seconds']:>9.1f} "
+                f"{_percentile(writes, 0.50):>8.1f} {_percentile(writes, 0.95):>8.1f} "
+                f"{_percentile(writes, 1):>8.1f} {errors:>7}"
+            )
+
+def _settings(engine, name):
+    return {
+        'ENGINE': engine, 'NAME': name, 'ATOMIC_REQUESTS': False, 'AUTOCOMMIT': True, 'CONN_MAX_AGE': 0,
+        'CONN_HEALTH_CHECKS': False, 'OPTIONS': {}, 'TIME_ZONE': None, 'TEST': {},
+    }
+
+def _connect(settings_dict):
+    # Connections are thread-local, so each thread gets its own wrapper
+    connections[ALIAS] = load_backend(settings_dict['ENGINE']).DatabaseWrapper(settings_dict, ALIAS)
+    return connections[ALIAS]
+
+def _run(settings_dict, readers, writers, seconds, users):
+    """Returns (reads, write latencies, errors) after `seconds`."""
+    connection = _connect(settings_dict)
+    with connection.cursor() as cursor:
+        for statement in SCHEMA:
+            cursor.execute(statement)
+    connection.close()
+
+    stop = threading.Event()
+    reads, writes, errors = [0] * readers, [[] for _ in range(writers)], [0] * (readers + writers)
+
+    def read(index):
+        connection = _connect(settings_dict)
+        while not stop.is_set():
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT id, kind, count FROM notification WHERE user_id = %s AND seen = 0", [random.randrange(users)])
+                    cursor.fetchall()
+                reads[index] += 1
+            except DatabaseError:
+                errors[index] += 1
+        connection.close()
+
+    def write(index):
+        connection = _connect(settings_dict)
+        while not stop.is_set():
+            user, kind = random.randrange(users), random.choice(('request', 'session', 'feedback'))
+            started = time.perf_counter()
+            try:
+                with transaction.atomic(using = ALIAS), connection.cursor() as cursor:
+                    cursor.execute("SELECT id FROM notification WHERE user_id = %s AND kind = %s AND seen = 0", [user, kind])
+                    row = cursor.fetchone()
+                    if row:
+                        cursor.execute("UPDATE notification SET count = count + 1 WHERE id = %s", [row[0]])
+                    else:
+                        cursor.execute("INSERT INTO notification (user_id, kind, count, seen) VALUES (%s, %s, 1, 0)", [user, kind])
+                    if random.random() < 0.1:
+                        cursor.execute("UPDATE notification SET seen = 1 WHERE user_id = %s", [user])
+                writes[index].append(time.perf_counter() - started)
+            except DatabaseError:
+                errors[readers + index] += 1
+        connection.close()
+
+    threads = [threading.Thread(target = read, args = (i,)) for i in range(readers)]
+    threads += [threading.Thread(target = write, args = (i,)) for i in range(writers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return sum(reads), [latency for latencies in writes for latency in latencies], sum(errors)
+
+def _percentile(latencies, q):
+    if not latencies:
+        return 0.0
+    return latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000
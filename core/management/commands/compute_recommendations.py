@@ -0,0 +1,20 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.recommendations import compute_recommendations
+
+
+class Command(BaseCommand):
+    help = "Score all mentees against all mentors and store each mentee's top mentors"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top-k', type = int, default = 10)
+        parser.add_argument('--batch-size', type = int, default = 1000)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        count = compute_recommendations(options['top_k'], options['batch_size'])
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(self.style.SUCCESS(f"Stored {count} recommendations in {elapsed:.2f}s"))
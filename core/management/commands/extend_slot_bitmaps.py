@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core import slots
+
+
+class Command(BaseCommand):
+    help = (
+        "Write recurring rule occurrences into the slot bitmaps for the next "
+        f"{slots.RULE_HORIZON_DAYS} days. Run daily so the window keeps moving forward."
+    )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            count = slots.refresh_rules()
+
+        self.stdout.write(self.style.SUCCESS(f"Extended bitmaps of {count} mentors with recurring rules"))
@@ -0,0 +1,34 @@
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core import imports
+
+
+class Command(BaseCommand):
+    help = "Create users, profiles and welcome notifications in bulk from a CSV or JSON file"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices = ['csv', 'json'], help = "Defaults to the file extension")
+        parser.add_argument('--workers', type = int, default = None, help = "Password hashing processes, defaults to every core")
+        parser.add_argument('--batch-size', type = int, default = imports.BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        fmt = options['format'] or ('csv' if path.suffix.lower() == '.csv' else 'json')
+
+        started = time.perf_counter()
+        try:
+            rows = imports.load(path.read_bytes(), fmt)
+            users = imports.import_users(rows, workers = options['workers'], batch_size = options['batch_size'])
+        except OSError as error:
+            raise CommandError(error)
+        except imports.InvalidImport as error:
+            for problem in error.errors:
+                self.stderr.write(f"row {problem['row']}: {problem['detail']}")
+            raise CommandError("Nothing was imported")
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(self.style.SUCCESS(f"Imported {len(users)} users in {elapsed:.2f}s"))
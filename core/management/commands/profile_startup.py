@@ -0,0 +1,117 @@
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Heavy or rarely needed modules that must stay out of the startup path.
+# Management commands only pay for django.setup(); workers also load the
+# URLconf on their first request.
+SETUP_LAZY = ('numpy', 'scipy', 'dateutil', 'core.views', 'rest_framework_simplejwt.authentication')
+WORKER_LAZY = ('scipy', 'core.matching', 'core.recommendations', 'core.exports', 'core.imports')
+
+# Runs in a fresh interpreter so nothing is already imported or cached
+PROBE = r'''
+import json, sys, time
+started = time.perf_counter()
+import django
+django.setup()
+setup = time.perf_counter()
+after_setup = sorted(m for m in sys.modules if m in LAZY)
+
+module = __import__(MODULE, fromlist = ['application'])
+imported = time.perf_counter()
+
+def request(path):
+    began = time.perf_counter()
+    status = []
+    environ = {
+        'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': '', 'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '80', 'HTTP_HOST': 'localhost', 'wsgi.url_scheme': 'http', 'wsgi.input': sys.stdin.buffer,
+        'wsgi.errors': sys.stderr,
+    }
+    body = module.application(environ, lambda code, headers, exc_info = None: status.append(code))
+    b''.join(body)
+    getattr(body, 'close', lambda: None)()
+    return status[0], time.perf_counter() - began
+
+responses = [(path,) + request(path) + request(path)[1:] for path in PATHS]
+print(json.dumps({
+    'setup': setup - started,
+    'import': imported - started,
+    'responses': responses,
+    'after_setup': after_setup,
+    'after_requests': sorted(m for m in sys.modules if m in LAZY),
+}))
+'''
+
+
+class Command(BaseCommand):
+    help = (
+        "Profile a cold start: an import-time breakdown of the WSGI module like "
+        "python -X importtime, then setup, import and first-response times in a "
+        "fresh interpreter. Fails when over --budget-ms or when a lazily imported "
+        "module is loaded eagerly."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--module', default = settings.WSGI_APPLICATION.rsplit('.', 1)[0])
+        parser.add_argument('--path', dest = 'paths', action = 'append', help = "Paths for first responses, default /auth/me")
+        parser.add_argument('--top', type = int, default = 20)
+        parser.add_argument('--budget-ms', type = float, help = "Fail when import plus the first response exceeds this")
+
+    def handle(self, *args, **options):
+        module, paths = options['module'], options['paths'] or ['/auth/me']
+
+        self._importtime(module, options['top'])
+
+        probe = f"MODULE = {module!r}\nPATHS = {paths!r}\nLAZY = {set(SETUP_LAZY + WORKER_LAZY)!r}\n" + PROBE
+        result = json.loads(self._run(['-c', probe]).stdout.splitlines()[-1])
+
+        self.stdout.write("\nCold start")
+        self.stdout.write(f"  django.setup()          {result['setup'] * 1000:8.1f} ms")
+        self.stdout.write(f"  import {module:<16} {result['import'] * 1000:8.1f} ms")
+        for path, status, first, second in result['responses']:
+            self.stdout.write(f"  GET {path:<20} {first * 1000:8.1f} ms first, {second * 1000:.1f} ms warm ({status})")
+
+        eager = sorted(set(result['after_setup']) & set(SETUP_LAZY)) + sorted(set(result['after_requests']) & set(WORKER_LAZY))
+        if eager:
+            raise CommandError(f"Imported eagerly: {', '.join(eager)}")
+
+        total = (result['import'] + result['responses'][0][2]) * 1000
+        if options['budget_ms'] is not None:
+            if total > options['budget_ms']:
+                raise CommandError(f"Startup took {total:.0f} ms, over the {options['budget_ms']:.0f} ms budget")
+            self.stdout.write(self.style.SUCCESS(f"Startup {total:.0f} ms within the {options['budget_ms']:.0f} ms budget"))
+
+    def _run(self, args):
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'backend.settings')}
+        completed = subprocess.run([sys.executable, *args], capture_output = True, text = True, env = env, cwd = settings.BASE_DIR)
+        if completed.returncode:
+            raise CommandError(completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else "Probe failed")
+        return completed
+
+    def _importtime(self, module, top):
+        stderr = self._run(['-X', 'importtime', '-c', f'import django; django.setup(); import {module}']).stderr
+
+        modules = []
+        for line in stderr.splitlines():
+            if not line.startswith('import time:') or 'cumulative' in line:
+                continue
+            own, cumulative, name = line[len('import time:'):].split('|')
+            modules.append((name.strip(), int(own), int(cumulative)))
+
+        by_package = defaultdict(int)
+        for name, own, _ in modules:
+            by_package[name.split('.')[0]] += own
+
+        self.stdout.write(f"Import time by package ({sum(by_package.values()) / 1000:.1f} ms total)")
+        for package, own in sorted(by_package.items(), key = lambda item: -item[1])[:top]:
+            self.stdout.write(f"  {package:<32} {own / 1000:8.1f} ms")
+
+        self.stdout.write("\nSlowest modules, cumulative")
+        for name, _, cumulative in sorted(modules, key = lambda module: -module[2])[:top]:
+            self.stdout.write(f"  {name:<48} {cumulative / 1000:8.1f} ms")
@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core import notifications
+
+
+class Command(BaseCommand):
+    help = "Apply the notification retention policy in bounded primary key chunks"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seen-days', type = int, default = settings.NOTIFICATION_SEEN_RETENTION_DAYS)
+        parser.add_argument('--max-unseen', type = int, default = settings.NOTIFICATION_MAX_UNSEEN)
+        parser.add_argument('--chunk-size', type = int, default = 1000)
+
+    def handle(self, *args, **options):
+        seen, unseen = notifications.prune(options['seen_days'], options['max_unseen'], options['chunk_size'])
+
+        self.stdout.write(self.style.SUCCESS(f"Deleted {seen} seen and {unseen} unseen notifications"))
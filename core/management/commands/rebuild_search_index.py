@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core import search
+
+
+class Command(BaseCommand):
+    help = "Rebuild the mentor full-text search index from every profile"
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            search.rebuild_index()
+
+        self.stdout.write(self.style.SUCCESS("Search index rebuilt"))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core import slots
+
+
+class Command(BaseCommand):
+    help = "Recompute every mentor's per-day free slot bitmap from availability, recurring rules and sessions"
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            count = slots.rebuild_all()
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} bitmaps"))
@@ -0,0 +1,110 @@
+import heapq
+from collections import deque
+
+import numpy as np
+
+from django.db import transaction
+from django.db.models import Count
+
+from .models import Profile, Mentorship
+from . import notifications
+from .notifications import notify
+from .recommendations import tfidf_matrices, score_batches
+
+def unmatched_mentees():
+    return list(
+        Profile.objects.filter(role = 'mentee', user__mentors__isnull = True)
+        .values_list('user_id', 'user__username', 'goals')
+    )
+
+def lock_mentors():
+    """
+    Lock every mentor profile until the transaction ends, so concurrent
+    auto-match runs read mentor load and unmatched mentees one at a time.
+    """
+    list(Profile.objects.select_for_update().filter(role = 'mentor').order_by('pk').values_list('pk', flat = True))
+
+def open_mentors(capacity = None):
+    """Mentors with at least one free slot, as (user_id, username, skills, free slots)."""
+    mentors = (
+        Profile.objects.filter(role = 'mentor')
+        .annotate(load = Count('user__mentees'))
+        .values_list('user_id', 'user__username', 'skills', 'capacity', 'load')
+    )
+    result = []
+    for user_id, username, skills, mentor_capacity, load in mentors:
+        free = (mentor_capacity if capacity is None else capacity) - load
+        if free > 0:
+            result.append((user_id, username, skills, free))
+    return result
+
+def stable_match(scores, capacities):
+    """
+    Mentee-proposing deferred acceptance with mentor capacities. Both sides
+    rank each other by the same compatibility score, so the result is stable:
+    no mentee and mentor would both rather be paired with each other.
+    Returns a list of (mentee index, mentor index).
+    """
+    n_mentees, n_mentors = scores.shape
+    preferences = np.argsort(-scores, axis = 1, kind = 'stable')
+    next_choice = [0] * n_mentees
+    held = [[] for _ in range(n_mentors)]
+
+    free = deque(range(n_mentees))
+    while free:
+        mentee = free.popleft()
+        if next_choice[mentee] >= n_mentors:
+            continue
+
+        mentor = preferences[mentee, next_choice[mentee]]
+        next_choice[mentee] += 1
+
+        # The lowest-scoring mentee held by this mentor is evicted first
+        heapq.heappush(held[mentor], (scores[mentee, mentor], -mentee))
+        if len(held[mentor]) > capacities[mentor]:
+            _, evicted = heapq.heappop(held[mentor])
+            free.append(-evicted)
+
+    return [(-mentee, mentor) for mentor, entries in enumerate(held) for _, mentee in entries]
+
+def auto_match(admin, capacity = None, batch_size = 1000):
+    """
+    Pair every unmatched mentee with a mentor that still has room and write
+    all mentorships in one transaction, with notifications written in
+    one batch after it commits. Runs are serialized on the mentor rows; a
+    pair created meanwhile by a manual match raises IntegrityError. Returns
+    the list of (mentee username, mentor username) pairs created.
+    """
+    with transaction.atomic(), notifications.batch():
+        return _auto_match(admin, capacity, batch_size)
+
+def _auto_match(admin, capacity, batch_size):
+    lock_mentors()
+    mentees = unmatched_mentees()
+    mentors = open_mentors(capacity)
+    if not mentees or not mentors:
+        return []
+
+    mentee_matrix, mentor_matrix = tfidf_matrices(
+        [goals for _, _, goals in mentees], [skills for _, _, skills, _ in mentors]
+    )
+    scores = np.empty((len(mentees), len(mentors)), dtype = np.float32)
+    for offset, block in score_batches(mentee_matrix, mentor_matrix, batch_size):
+        scores[offset:offset + block.shape[0]] = block
+
+    pairs = stable_match(scores, [free for _, _, _, free in mentors])
+
+    mentorships = []
+    for mentee_index, mentor_index in pairs:
+        mentee_id, mentee_name, _ = mentees[mentee_index]
+        mentor_id, mentor_name, _, _ = mentors[mentor_index]
+
+        mentorships.append(Mentorship(mentee_id = mentee_id, mentor_id = mentor_id))
+        notify(mentee_id, f"The admin user {admin.username} matched you with the mentor {mentor_name}")
+        notify(mentor_id, f"The admin user {admin.username} matched you with {mentee_name}")
+
+    notify(admin, f"You automatically matched {len(pairs)} mentees with mentors")
+
+    Mentorship.objects.bulk_create(mentorships, batch_size = 1000)
+
+    return [(mentees[i][1], mentors[j][1]) for i, j in pairs]
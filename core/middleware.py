@@ -0,0 +1,26 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from . import notifications
+
+
+class NotificationBatchMiddleware:
+    """Write all notifications produced by a request in one batch after it commits."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        with notifications.batch():
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        with notifications.batch():
+            return await self.get_response(request)
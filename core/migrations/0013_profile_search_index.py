@@ -0,0 +1,42 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+
+    if vendor == 'sqlite':
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE core_profile_search USING fts5("
+            "bio, skills, goals, tokenize = 'porter unicode61')"
+        )
+        schema_editor.execute(
+            "INSERT INTO core_profile_search (rowid, bio, skills, goals) "
+            "SELECT user_id, bio, skills, goals FROM core_profile"
+        )
+
+    elif vendor == 'postgresql':
+        schema_editor.execute(
+            "CREATE INDEX core_profile_search_idx ON core_profile USING GIN "
+            "(to_tsvector('english', bio || ' ' || skills || ' ' || goals))"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+
+    if vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE IF EXISTS core_profile_search")
+
+    elif vendor == 'postgresql':
+        schema_editor.execute("DROP INDEX IF EXISTS core_profile_search_idx")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_alter_availability_id_alter_mentorshiprequest_id_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
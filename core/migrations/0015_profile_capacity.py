@@ -0,0 +1,18 @@
+# Generated by Django 5.0.3 on 2026-10-18 15:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_recommendation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='capacity',
+            field=models.PositiveIntegerField(default=5),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.0.3 on 2026-10-18 15:40
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_profile_capacity'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='session',
+            name='end',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='session',
+            name='start',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='availability',
+            index=models.Index(fields=['mentor', 'date', 'start'], name='availability_mentor_date'),
+        ),
+        migrations.AddIndex(
+            model_name='session',
+            index=models.Index(fields=['mentorship', 'start', 'end'], name='session_mentorship_window'),
+        ),
+    ]
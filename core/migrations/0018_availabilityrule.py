@@ -0,0 +1,33 @@
+# Generated by Django 5.0.3 on 2026-10-18 15:43
+
+import core.utils
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_availabilitybitmap'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AvailabilityRule',
+            fields=[
+                ('id', models.CharField(default=core.utils.cuid_wrapper, editable=False, max_length=255, primary_key=True, serialize=False)),
+                ('rrule', models.CharField(max_length=255)),
+                ('dtstart', models.DateField()),
+                ('until', models.DateField(blank=True, null=True)),
+                ('start', models.TimeField()),
+                ('end', models.TimeField()),
+                ('exdates', models.JSONField(blank=True, default=list)),
+                ('mentor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='availability_rules', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['mentor', 'dtstart'], name='rule_mentor_dtstart')],
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.0.3 on 2026-10-18 15:46
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def count_unread(apps, schema_editor):
+    Notification = apps.get_model('core', 'Notification')
+    Profile = apps.get_model('core', 'Profile')
+
+    unread = Notification.objects.filter(seen=False).values('user_id').annotate(total=Count('id'))
+    for row in unread:
+        Profile.objects.filter(user_id=row['user_id']).update(unread_notifications=row['total'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0019_notification_kind_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='unread_notifications',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(count_unread, migrations.RunPython.noop),
+    ]
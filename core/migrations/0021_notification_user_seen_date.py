@@ -0,0 +1,19 @@
+# Generated by Django 5.0.3 on 2026-10-18 15:47
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0020_profile_unread_notifications'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', 'seen', 'date'], name='notification_user_seen_date'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.0.3 on 2026-10-18 15:51
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0021_notification_user_seen_date'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='mentorshiprequest',
+            index=models.Index(fields=['mentee', 'created_at', 'id'], name='request_mentee_created'),
+        ),
+        migrations.AddIndex(
+            model_name='mentorshiprequest',
+            index=models.Index(fields=['mentor', 'created_at', 'id'], name='request_mentor_created'),
+        ),
+        migrations.AddIndex(
+            model_name='session',
+            index=models.Index(fields=['date', 'id'], name='session_date_id'),
+        ),
+    ]
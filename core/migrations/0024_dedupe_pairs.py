@@ -0,0 +1,40 @@
+from django.db import migrations
+from django.db.models import Count, Min
+
+
+def dedupe_pairs(apps, schema_editor):
+    """Clear out duplicates ahead of the unique constraints in 0025."""
+    Mentorship = apps.get_model('core', 'Mentorship')
+    MentorshipRequest = apps.get_model('core', 'MentorshipRequest')
+    Session = apps.get_model('core', 'Session')
+
+    pairs = (
+        Mentorship.objects.values('mentee_id', 'mentor_id')
+        .annotate(copies = Count('id'), keep = Min('id')).filter(copies__gt = 1)
+    )
+    for pair in pairs:
+        duplicates = Mentorship.objects.filter(
+            mentee_id = pair['mentee_id'], mentor_id = pair['mentor_id']
+        ).exclude(pk = pair['keep'])
+        # Sessions would otherwise lose their mentorship (SET_NULL)
+        Session.objects.filter(mentorship__in = duplicates).update(mentorship_id = pair['keep'])
+        duplicates.delete()
+
+    pending = MentorshipRequest.objects.filter(status = 'pending')
+    pairs = pending.values('mentee_id', 'mentor_id').annotate(copies = Count('id')).filter(copies__gt = 1)
+    for pair in pairs:
+        requests = pending.filter(mentee_id = pair['mentee_id'], mentor_id = pair['mentor_id'])
+        # Keep the first request sent
+        first = requests.order_by('created_at', 'id').values_list('pk', flat = True).first()
+        requests.exclude(pk = first).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0023_profile_version'),
+    ]
+
+    operations = [
+        migrations.RunPython(dedupe_pairs, migrations.RunPython.noop),
+    ]
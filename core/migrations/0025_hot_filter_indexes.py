@@ -0,0 +1,69 @@
+# Generated by Django 5.0.3 on 2026-10-18 16:22
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0024_dedupe_pairs'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='availability',
+            name='availability_mentor_date',
+        ),
+        migrations.RemoveIndex(
+            model_name='notification',
+            name='notification_user_seen_date',
+        ),
+        migrations.AlterField(
+            model_name='availability',
+            name='mentor',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='availability', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='mentorship',
+            name='mentee',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='mentors', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='mentorshiprequest',
+            name='mentee',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='mentee_request', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='mentorshiprequest',
+            name='mentor',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='mentor_request', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='notification',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='availability',
+            index=models.Index(fields=['mentor', 'date', 'start', 'end'], name='availability_mentor_day'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', 'date', 'id'], name='notification_user_date'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(condition=models.Q(('seen', False)), fields=['user', 'date', 'id'], name='notification_unseen'),
+        ),
+        migrations.AddConstraint(
+            model_name='mentorship',
+            constraint=models.UniqueConstraint(fields=('mentee', 'mentor'), name='mentorship_pair'),
+        ),
+        migrations.AddConstraint(
+            model_name='mentorshiprequest',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'pending')), fields=('mentor', 'mentee'), name='request_pending_pair'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.3 on 2026-10-18 16:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0025_hot_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='availabilityrule',
+            name='materialized_until',
+            field=models.DateField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -20,6 +20,10 @@ class Profile(models.Model):
     bio = models.TextField(blank = True)
     skills = models.TextField(blank = True)
     goals = models.TextField(blank = True)
+    capacity = models.PositiveIntegerField(default = 5)
+    unread_notifications = models.PositiveIntegerField(default = 0)
+    # Bumped by every write that changes what this user's reads return
+    version = models.PositiveIntegerField(default = 0)
 
 
 class Availability(models.Model):
@@ -29,13 +33,20 @@ class Availability(models.Model):
             default = cuid_wrapper,
             editable = False
         )
+    # Indexed by availability_mentor_day, which leads with mentor
     mentor = models.ForeignKey(
-            User, on_delete = models.CASCADE, related_name = 'availability'
+            User, on_delete = models.CASCADE, related_name = 'availability', db_index = False
         )
     date = models.DateField()
     start = models.TimeField()
     end = models.TimeField()
 
+    class Meta:
+        indexes = [
+            # Covers the slot, overlap and calendar reads without a table lookup
+            models.Index(fields = ['mentor', 'date', 'start', 'end'], name = 'availability_mentor_day'),
+        ]
+
 class MentorshipRequest(models.Model):
     id = models.CharField(
         primary_key = True,
@@ -43,8 +54,9 @@ class MentorshipRequest(models.Model):
         default = cuid_wrapper,
         editable = False
     )
-    mentee = models.ForeignKey(User, on_delete = models.CASCADE, related_name = 'mentee_request')
-    mentor = models.ForeignKey(User, on_delete = models.CASCADE, related_name = 'mentor_request')
+    # Both indexed by the composite indexes below
+    mentee = models.ForeignKey(User, on_delete = models.CASCADE, related_name = 'mentee_request', db_index = False)
+    mentor = models.ForeignKey(User, on_delete = models.CASCADE, related_name = 'mentor_request', db_index = False)
 
     status_choices = [
         ('pending', 'Pending'),
@@ -54,11 +66,29 @@ class MentorshipRequest(models.Model):
     status = models.CharField(max_length = 8, choices = status_choices)
     created_at = models.DateTimeField(auto_now = True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields = ['mentee', 'created_at', 'id'], name = 'request_mentee_created'),
+            models.Index(fields = ['mentor', 'created_at', 'id'], name = 'request_mentor_created'),
+        ]
+        constraints = [
+            # At most one open request per pair; also indexes a mentor's pending requests
+            models.UniqueConstraint(
+                fields = ['mentor', 'mentee'], condition = models.Q(status = 'pending'), name = 'request_pending_pair'
+            ),
+        ]
+
 class Mentorship(models.Model):
-    mentee = models.ForeignKey(User, on_delete = models.CASCADE, related_name = 'mentors')
+    # Indexed by mentorship_pair
+    mentee = models.ForeignKey(User, on_delete = models.CASCADE, related_name = 'mentors', db_index = False)
     mentor = models.ForeignKey(User, on_delete = models.CASCADE, related_name = 'mentees')
     created_at = models.DateTimeField(auto_now = True)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields = ['mentee', 'mentor'], name = 'mentorship_pair'),
+        ]
+
 class Session(models.Model):
     id = models.CharField(
         primary_key = True,
@@ -68,12 +98,76 @@ class Session(models.Model):
     )
     mentorship = models.ForeignKey(Mentorship, on_delete = models.SET_NULL, null = True, blank = True, related_name = 'sessions')
     date = models.DateField()
+    start = models.DateTimeField(null = True, blank = True)
+    end = models.DateTimeField(null = True, blank = True)
     feedback = models.TextField(null = True, blank = True)
     rating = models.PositiveIntegerField(null = True, blank = True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields = ['mentorship', 'start', 'end'], name = 'session_mentorship_window'),
+            models.Index(fields = ['date', 'id'], name = 'session_date_id'),
+        ]
+
 class Notification(models.Model):
-    user = models.ForeignKey(User, on_delete = models.CASCADE, related_name = 'notifications')
+    # Indexed by notification_user_date
+    user = models.ForeignKey(User, on_delete = models.CASCADE, related_name = 'notifications', db_index = False)
     text = models.CharField(max_length = 255)
+    kind = models.CharField(max_length = 32, blank = True)
+    count = models.PositiveIntegerField(default = 1)
     seen = models.BooleanField(default = False)
     date = models.DateTimeField(auto_now = True)
-    
\ No newline at end of file
+
+    class Meta:
+        indexes = [
+            models.Index(fields = ['user', 'date', 'id'], name = 'notification_user_date'),
+            # filter(seen = False) compiles to NOT seen, which a (user, seen)
+            # index can't serve on SQLite; a partial index on it can
+            models.Index(fields = ['user', 'date', 'id'], condition = models.Q(seen = False), name = 'notification_unseen'),
+        ]
+    
+class Recommendation(models.Model):
+    mentee = models.ForeignKey(User, on_delete = models.CASCADE, related_name = 'recommendations')
+    mentor = models.ForeignKey(User, on_delete = models.CASCADE, related_name = 'recommended_to')
+    score = models.FloatField()
+    rank = models.PositiveIntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields = ['mentee', 'rank'], name = 'recommendation_mentee_rank'),
+        ]
+
+class AvailabilityBitmap(models.Model):
+    mentor = models.ForeignKey(User, on_delete = models.CASCADE, related_name = 'availability_bitmaps')
+    date = models.DateField()
+    # 96 bits, one per 15 minute slot of the day, set when the mentor is free
+    slots = models.BinaryField(max_length = 12)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields = ['date', 'mentor'], name = 'bitmap_date_mentor'),
+        ]
+
+class AvailabilityRule(models.Model):
+    id = models.CharField(
+        primary_key = True,
+        max_length = 255,
+        default = cuid_wrapper,
+        editable = False
+    )
+    mentor = models.ForeignKey(User, on_delete = models.CASCADE, related_name = 'availability_rules')
+    # RFC 5545 RRULE body, e.g. "FREQ=WEEKLY;BYDAY=TU", expanded from dtstart
+    rrule = models.CharField(max_length = 255)
+    dtstart = models.DateField()
+    until = models.DateField(null = True, blank = True)
+    start = models.TimeField()
+    end = models.TimeField()
+    exdates = models.JSONField(default = list, blank = True)
+    # Occurrences up to this day are stored in the slot bitmaps; later ones
+    # are expanded when a search asks for them
+    materialized_until = models.DateField(null = True, blank = True, editable = False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields = ['mentor', 'dtstart'], name = 'rule_mentor_dtstart'),
+        ]
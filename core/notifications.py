@@ -0,0 +1,186 @@
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F, Max, Min
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import Notification, Profile
+from . import events, etags
+
+# Kinds listed here are folded into the recipient's unseen notification of
+# the same kind instead of adding a new row each time.
+COALESCED = {
+    'request_received': "You received {count} new mentorship requests",
+    'profile_updated': "You updated your profile {count} times",
+}
+
+_pending = ContextVar('pending_notifications', default = None)
+
+def notify(user, text, kind = ''):
+    """
+    Queue a notification. Inside batch() it is written with the rest of the
+    batch once the surrounding transaction commits.
+    """
+    pending = _pending.get()
+    item = (user.pk if hasattr(user, 'pk') else user, text, kind)
+
+    if pending is None:
+        transaction.on_commit(lambda: flush([item]))
+    else:
+        pending.append(item)
+
+@contextmanager
+def batch():
+    """Collect every notify() call in the block and flush them together."""
+    if _pending.get() is not None:
+        yield
+        return
+
+    pending = []
+    token = _pending.set(pending)
+    try:
+        yield
+    finally:
+        _pending.reset(token)
+
+    if pending:
+        transaction.on_commit(lambda: flush(pending))
+
+def flush(items):
+    groups = {}
+    rows = []
+    for user_id, text, kind in items:
+        if kind in COALESCED:
+            groups.setdefault((user_id, kind), []).append(text)
+        else:
+            rows.append(Notification(user_id = user_id, text = text, kind = kind))
+
+    if groups:
+        existing = {
+            (n.user_id, n.kind): n
+            for n in Notification.objects.filter(
+                seen = False,
+                kind__in = {kind for _, kind in groups},
+                user_id__in = {user_id for user_id, _ in groups}
+            ).order_by('date')
+        }
+
+        updated = []
+        for (user_id, kind), texts in groups.items():
+            current = existing.get((user_id, kind))
+            if current is not None:
+                current.count += len(texts)
+                current.text = COALESCED[kind].format(count = current.count)
+                current.date = timezone.now()
+                updated.append(current)
+            elif len(texts) == 1:
+                rows.append(Notification(user_id = user_id, text = texts[0], kind = kind))
+            else:
+                rows.append(Notification(
+                    user_id = user_id, kind = kind, count = len(texts),
+                    text = COALESCED[kind].format(count = len(texts))
+                ))
+
+        if updated:
+            Notification.objects.bulk_update(updated, ['text', 'count', 'date'])
+            etags.bump(*{n.user_id for n in updated})
+            _publish(updated)
+
+    if rows:
+        with transaction.atomic():
+            Notification.objects.bulk_create(rows, batch_size = 1000)
+            _add_unread(Counter(row.user_id for row in rows))
+        _publish(rows)
+
+def _publish(rows):
+    broker = events.get_broker()
+    for row in rows:
+        broker.publish(row.user_id, {
+            'id': row.pk, 'text': row.text, 'count': row.count,
+            'seen': row.seen, 'date': row.date.isoformat()
+        })
+
+def _add_unread(per_user):
+    # One UPDATE per distinct increment, usually just one
+    by_amount = {}
+    for user_id, amount in per_user.items():
+        by_amount.setdefault(amount, []).append(user_id)
+    for amount, user_ids in by_amount.items():
+        Profile.objects.filter(user_id__in = user_ids).update(
+            unread_notifications = F('unread_notifications') + amount,
+            version = F('version') + 1
+        )
+
+def mark_seen(user, ids = None):
+    """Mark the user's unseen notifications (or just `ids`) as seen."""
+    with transaction.atomic():
+        unseen = Notification.objects.filter(user = user, seen = False)
+        if ids is not None:
+            unseen = unseen.filter(pk__in = ids)
+        changed = unseen.update(seen = True)
+
+        if changed:
+            Profile.objects.filter(user = user).update(
+                unread_notifications = Greatest(F('unread_notifications') - changed, 0),
+                version = F('version') + 1
+            )
+    return changed
+
+def delete_all(user):
+    with transaction.atomic():
+        user.notifications.all().delete()
+        Profile.objects.filter(user = user).update(unread_notifications = 0, version = F('version') + 1)
+
+def _delete_by_pk_range(queryset, chunk_size, touched = None):
+    """
+    Delete matching rows one primary key window at a time, each window in
+    its own short statement, so no single delete holds locks for long.
+    """
+    bounds = queryset.aggregate(low = Min('pk'), high = Max('pk'))
+    if bounds['low'] is None:
+        return 0
+
+    deleted = 0
+    for low in range(bounds['low'], bounds['high'] + 1, chunk_size):
+        chunk = queryset.filter(pk__gte = low, pk__lt = low + chunk_size)
+        if touched is not None:
+            touched.update(chunk.values_list('user_id', flat = True).distinct())
+        count, _ = chunk.delete()
+        deleted += count
+    return deleted
+
+def prune(seen_days, max_unseen, chunk_size = 1000):
+    """
+    Drop seen notifications older than `seen_days` and trim each user's
+    unseen notifications to the newest `max_unseen`. Returns
+    (seen deleted, unseen deleted).
+    """
+    cutoff = timezone.now() - timedelta(days = seen_days)
+    touched = set()
+    seen_deleted = _delete_by_pk_range(
+        Notification.objects.filter(seen = True, date__lt = cutoff), chunk_size, touched
+    )
+    etags.bump(*touched)
+
+    unseen_deleted = 0
+    over_cap = Profile.objects.filter(unread_notifications__gt = max_unseen).values_list('user_id', flat = True)
+    for user_id in over_cap.iterator():
+        unseen = Notification.objects.filter(user_id = user_id, seen = False)
+        boundary = unseen.order_by('-date', '-id').values_list('date', 'id')[max_unseen:max_unseen + 1].first()
+        if boundary is None:
+            continue
+
+        date, pk = boundary
+        stale = unseen.filter(date__lt = date) | unseen.filter(date = date, pk__lte = pk)
+        count = _delete_by_pk_range(stale, chunk_size)
+        Profile.objects.filter(user_id = user_id).update(
+            unread_notifications = Greatest(F('unread_notifications') - count, 0),
+            version = F('version') + 1
+        )
+        unseen_deleted += count
+
+    return seen_deleted, unseen_deleted
@@ -0,0 +1,99 @@
+import base64
+import json
+
+from django.db.models import Q
+
+from rest_framework import status
+from rest_framework.views import Response
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+# Most rows an admin list returns as a plain list with ?all=1
+MAX_ALL_ROWS = 1000
+
+class InvalidCursor(ValueError):
+    pass
+
+def encode_cursor(values):
+    raw = json.dumps([value.isoformat() if hasattr(value, 'isoformat') else value for value in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(model, ordering, cursor):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if len(values) != len(ordering):
+            raise ValueError
+        return [
+            model._meta.get_field(name.lstrip('-')).to_python(value)
+            for name, value in zip(ordering, values)
+        ]
+    except Exception:
+        raise InvalidCursor("Invalid cursor")
+
+def page_size_from(request, default = DEFAULT_PAGE_SIZE):
+    try:
+        size = int(request.GET.get('page_size', default))
+    except ValueError:
+        raise InvalidCursor("page_size must be an integer")
+    return min(max(size, 1), MAX_PAGE_SIZE)
+
+def after(ordering, values):
+    """
+    Keyset filter selecting rows strictly after `values` in `ordering`, e.g.
+    for ('-date', '-id'): date < d OR (date = d AND id < i).
+    """
+    condition = Q()
+    for position, name in enumerate(ordering):
+        field = name.lstrip('-')
+        lookup = 'lt' if name.startswith('-') else 'gt'
+        clause = Q(**{f'{field}__{lookup}': values[position]})
+        for earlier, value in zip(ordering[:position], values):
+            clause &= Q(**{earlier.lstrip('-'): value})
+        condition |= clause
+    return condition
+
+def keyset_page(queryset, ordering, cursor = None, page_size = DEFAULT_PAGE_SIZE):
+    """
+    Return (rows, next cursor) for one page. The ordering must end in a
+    unique column so every row has a distinct position.
+    """
+    rows = list(_page_query(queryset, ordering, cursor, page_size))
+    return _split(rows, ordering, page_size)
+
+async def akeyset_page(queryset, ordering, cursor = None, page_size = DEFAULT_PAGE_SIZE):
+    """keyset_page for async views."""
+    rows = [row async for row in _page_query(queryset, ordering, cursor, page_size)]
+    return _split(rows, ordering, page_size)
+
+def _page_query(queryset, ordering, cursor, page_size):
+    queryset = queryset.order_by(*ordering)
+    if cursor:
+        queryset = queryset.filter(after(ordering, decode_cursor(queryset.model, ordering, cursor)))
+    return queryset[:page_size + 1]
+
+def _split(rows, ordering, page_size):
+    if len(rows) <= page_size:
+        return rows, None
+
+    rows = rows[:page_size]
+    last = rows[-1]
+    return rows, encode_cursor([getattr(last, name.lstrip('-')) for name in ordering])
+
+def requested(request):
+    """Whether the client asked for cursor pagination on a legacy list endpoint."""
+    return 'cursor' in request.GET or 'page_size' in request.GET
+
+def all_requested(request):
+    """Whether the client asked for the capped plain list (?all=1) of an admin list."""
+    return request.GET.get('all') == '1'
+
+def page_response(request, queryset, ordering, serializer_class):
+    try:
+        rows, next_cursor = keyset_page(
+            queryset, ordering, request.GET.get('cursor'), page_size_from(request)
+        )
+    except InvalidCursor as error:
+        return Response({"detail": str(error)}, status = status.HTTP_400_BAD_REQUEST)
+
+    serializer = serializer_class(rows, many = True)
+    return Response({"results": serializer.data, "next": next_cursor}, status = status.HTTP_200_OK)
@@ -0,0 +1,115 @@
+import math
+import re
+from collections import Counter
+
+import numpy as np
+from scipy import sparse
+
+from django.db import transaction
+
+from .models import Profile, Mentorship, Recommendation
+
+TOKEN_RE = re.compile(r'[a-z0-9+#]+')
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower())
+
+def tfidf_matrices(mentee_docs, mentor_docs):
+    """
+    Build L2-normalised TF-IDF rows for mentee goals and mentor skills over
+    one shared vocabulary, so a row product is their cosine similarity.
+    """
+    counts = [Counter(tokenize(doc)) for doc in mentee_docs + mentor_docs]
+
+    vocabulary = {}
+    for doc in counts:
+        for term in doc:
+            vocabulary.setdefault(term, len(vocabulary))
+
+    rows, cols, values = [], [], []
+    for row, doc in enumerate(counts):
+        for term, count in doc.items():
+            rows.append(row)
+            cols.append(vocabulary[term])
+            values.append(1.0 + math.log(count))
+
+    matrix = sparse.csr_matrix(
+        (values, (rows, cols)), shape = (len(counts), max(len(vocabulary), 1)), dtype = np.float32
+    )
+
+    doc_freq = np.bincount(matrix.indices, minlength = matrix.shape[1])
+    idf = np.log((1 + len(counts)) / (1 + doc_freq)) + 1.0
+    matrix = matrix @ sparse.diags(idf.astype(np.float32))
+
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis = 1)).ravel())
+    norms[norms == 0] = 1.0
+    matrix = sparse.diags(1.0 / norms) @ matrix
+
+    matrix = matrix.tocsr()
+    return matrix[:len(mentee_docs)], matrix[len(mentee_docs):]
+
+def score_batches(mentee_matrix, mentor_matrix, batch_size):
+    """Yield (offset, dense score block) for successive slices of mentees."""
+    mentor_t = mentor_matrix.T.tocsc()
+    for offset in range(0, mentee_matrix.shape[0], batch_size):
+        block = mentee_matrix[offset:offset + batch_size] @ mentor_t
+        yield offset, block.toarray()
+
+def load_profiles():
+    mentees = list(Profile.objects.filter(role = 'mentee').values_list('user_id', 'goals'))
+    mentors = list(Profile.objects.filter(role = 'mentor').values_list('user_id', 'skills'))
+    return mentees, mentors
+
+def compute_recommendations(top_k = 10, batch_size = 1000):
+    """
+    Score every mentee against every mentor and replace the stored
+    recommendations with each mentee's top_k matches. Returns the number
+    of rows written.
+    """
+    mentees, mentors = load_profiles()
+    results = []
+
+    if mentees and mentors:
+        mentee_matrix, mentor_matrix = tfidf_matrices(
+            [goals for _, goals in mentees], [skills for _, skills in mentors]
+        )
+
+        mentee_index = {user_id: i for i, (user_id, _) in enumerate(mentees)}
+        mentor_index = {user_id: i for i, (user_id, _) in enumerate(mentors)}
+        matched = {}
+        for mentee_id, mentor_id in Mentorship.objects.values_list('mentee_id', 'mentor_id'):
+            if mentee_id in mentee_index and mentor_id in mentor_index:
+                matched.setdefault(mentee_index[mentee_id], []).append(mentor_index[mentor_id])
+
+        k = min(top_k, len(mentors))
+        for offset, scores in score_batches(mentee_matrix, mentor_matrix, batch_size):
+            # Existing pairs are never recommended again
+            for row in range(scores.shape[0]):
+                if offset + row in matched:
+                    scores[row, matched[offset + row]] = -1.0
+
+            top = np.argpartition(-scores, k - 1, axis = 1)[:, :k]
+            top_scores = np.take_along_axis(scores, top, axis = 1)
+            order = np.argsort(-top_scores, axis = 1)
+            top = np.take_along_axis(top, order, axis = 1)
+            top_scores = np.take_along_axis(top_scores, order, axis = 1)
+
+            for row in range(scores.shape[0]):
+                mentee_id = mentees[offset + row][0]
+                rank = 0
+                for col, score in zip(top[row], top_scores[row]):
+                    if score <= 0:
+                        break
+                    rank += 1
+                    results.append(Recommendation(
+                        mentee_id = mentee_id,
+                        mentor_id = mentors[col][0],
+                        score = float(score),
+                        rank = rank
+                    ))
+
+    with transaction.atomic():
+        Recommendation.objects.all().delete()
+        Recommendation.objects.bulk_create(results, batch_size = 1000)
+
+    return len(results)
@@ -0,0 +1,55 @@
+from datetime import datetime, time
+
+from dateutil.rrule import rrule, rrulestr, DAILY, WEEKLY, MONTHLY, YEARLY
+
+from django.db.models import Q
+
+from .models import AvailabilityRule
+
+ALLOWED_FREQUENCIES = (DAILY, WEEKLY, MONTHLY, YEARLY)
+MAX_WINDOW_DAYS = 366
+
+def parse_rule(text, dtstart):
+    """Validate an RRULE body and return the dateutil rule anchored at dtstart."""
+    text = text.strip()
+    if text.upper().startswith('RRULE:'):
+        text = text[len('RRULE:'):]
+    if 'DTSTART' in text.upper():
+        raise ValueError("Pass dtstart separately, not inside the rule")
+
+    rule = rrulestr(text, dtstart = datetime.combine(dtstart, time(0)))
+    if not isinstance(rule, rrule):
+        raise ValueError("Expected a single RRULE")
+    if rule._freq not in ALLOWED_FREQUENCIES:
+        raise ValueError("Only daily, weekly, monthly and yearly rules are supported")
+    return text, rule
+
+def occurrences(rule, first_day, last_day):
+    """Dates in [first_day, last_day] on which the rule produces a block."""
+    first_day = max(first_day, rule.dtstart)
+    if rule.until is not None:
+        last_day = min(last_day, rule.until)
+    if first_day > last_day:
+        return []
+
+    _, expanded = parse_rule(rule.rrule, rule.dtstart)
+    skipped = set(rule.exdates)
+    dates = expanded.between(
+        datetime.combine(first_day, time(0)), datetime.combine(last_day, time(0)), inc = True
+    )
+    return [dt.date() for dt in dates if dt.date().isoformat() not in skipped]
+
+def active_rules(first_day, last_day):
+    return AvailabilityRule.objects.filter(
+        Q(until__isnull = True) | Q(until__gte = first_day), dtstart__lte = last_day
+    )
+
+def rules_on(day, **filters):
+    """Rules with an occurrence on `day`, expanded only over that day."""
+    return [rule for rule in active_rules(day, day).filter(**filters) if occurrences(rule, day, day)]
+
+def blocks(mentor, first_day, last_day):
+    """Yield (date, start, end) for each rule occurrence of a mentor in the window."""
+    for rule in active_rules(first_day, last_day).filter(mentor = mentor):
+        for day in occurrences(rule, first_day, last_day):
+            yield day, rule.start, rule.end
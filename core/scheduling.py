@@ -0,0 +1,153 @@
+from datetime import time, timedelta
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from .models import Availability, Mentorship, Session
+from . import recurrence, slots
+
+DEFAULT_SESSION_MINUTES = 60
+# A session has to fit inside one day of availability
+MAX_SESSION_MINUTES = 24 * 60
+
+# Availability can be entered from yesterday, for clients a day behind the
+# server's time zone, up to a year ahead
+MAX_AVAILABILITY_DAYS_AHEAD = 366
+
+def check_availability_date(day):
+    """Raise ValueError for an availability date outside the accepted window."""
+    today = timezone.localdate()
+    first_day = today - timedelta(days = 1)
+    last_day = today + timedelta(days = MAX_AVAILABILITY_DAYS_AHEAD)
+    if not first_day <= day <= last_day:
+        raise ValueError(f"Date must be between {first_day} and {last_day}.")
+
+def session_window(start, minutes = DEFAULT_SESSION_MINUTES):
+    """Return an aware (start, end) pair, treating naive input as local time."""
+    if timezone.is_naive(start):
+        start = timezone.make_aware(start)
+    return start, start + timedelta(minutes = minutes)
+
+def overlapping_sessions(mentor, start, end):
+    # Half-open intervals: back-to-back sessions do not clash
+    return Session.objects.filter(mentorship__mentor = mentor, start__lt = end, end__gt = start)
+
+def local_window(start, end):
+    """
+    (day, start time, end time) of a window inside one local day, or None
+    when it spans days. A window ending exactly at the next midnight ends at
+    slots.END_OF_DAY, so blocks that run to the end of the day cover it.
+    """
+    local_start = timezone.localtime(start)
+    local_end = timezone.localtime(end)
+    day = local_start.date()
+    if local_end.date() == day:
+        return day, local_start.time(), local_end.time()
+    if local_end.date() == day + timedelta(days = 1) and local_end.time() == time(0):
+        return day, local_start.time(), slots.END_OF_DAY
+    return None
+
+def covering_availability(mentor, start, end):
+    window = local_window(start, end)
+    if window is None:
+        return Availability.objects.none()
+
+    day, start_time, end_time = window
+    return Availability.objects.filter(
+        mentor = mentor,
+        date = day,
+        start__lte = start_time,
+        end__gte = end_time
+    )
+
+def lock_mentor(mentorship_id):
+    """
+    Lock the mentorship's mentor until the transaction ends, so concurrent
+    bookings for one mentor check for clashes one at a time. Returns False
+    when there is no such mentorship.
+    """
+    mentor = User.objects.select_for_update(of = ('self',)).filter(mentees__pk = mentorship_id)
+    return bool(list(mentor.values_list('pk', flat = True)))
+
+def mentorship_with_checks(mentorship_id, start, end):
+    """
+    Fetch the mentorship together with whether the window fits inside one of
+    the mentor's availability blocks and whether it clashes with a booked
+    session, all in a single query.
+    """
+    return (
+        Mentorship.objects.filter(pk = mentorship_id)
+        .select_related('mentor', 'mentee')
+        .annotate(
+            fits = Exists(covering_availability(OuterRef('mentor'), start, end)),
+            clashes = Exists(overlapping_sessions(OuterRef('mentor'), start, end))
+        )
+        .first()
+    )
+
+def fits_recurring(mentor, start, end):
+    """Whether the window fits inside an occurrence of one of the mentor's rules."""
+    window = local_window(start, end)
+    if window is None:
+        return False
+
+    day, start_time, end_time = window
+    return bool(recurrence.rules_on(day, mentor = mentor, start__lte = start_time, end__gte = end_time))
+
+def merge_intervals(intervals):
+    """Sweep sorted (start, end) pairs, joining any that overlap or touch."""
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+def upsert_availability(mentor, blocks, replace = False):
+    """
+    Merge (date, start, end) blocks into the mentor's availability, one day
+    at a time. Existing rows are folded into the merge unless `replace` is
+    set, and only rows that differ from the merged result are deleted or
+    created. Returns (created, deleted) counts.
+    """
+    by_day = {}
+    for day, start, end in blocks:
+        by_day.setdefault(day, []).append((start, end))
+
+    with transaction.atomic():
+        existing = {}
+        rows = Availability.objects.select_for_update().filter(mentor = mentor, date__in = by_day)
+        for pk, day, start, end in rows.values_list('id', 'date', 'start', 'end'):
+            existing.setdefault(day, []).append((pk, (start, end)))
+
+        to_create = []
+        to_delete = []
+        for day, intervals in by_day.items():
+            current = existing.get(day, [])
+            if not replace:
+                intervals = intervals + [interval for _, interval in current]
+            wanted = set(merge_intervals(intervals))
+
+            for pk, interval in current:
+                if interval in wanted:
+                    wanted.discard(interval)
+                else:
+                    to_delete.append(pk)
+            to_create.extend(
+                Availability(mentor = mentor, date = day, start = start, end = end)
+                for start, end in sorted(wanted)
+            )
+
+        # A queryset delete still sends post_delete per row, so the signal
+        # refreshes are muted and all touched days refreshed at once
+        with slots.batched():
+            Availability.objects.filter(pk__in = to_delete).delete()
+        Availability.objects.bulk_create(to_create, batch_size = 1000)
+
+        slots.refresh_days(mentor.id, by_day)
+
+    return len(to_create), len(to_delete)
@@ -0,0 +1,99 @@
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+from .models import Profile
+
+# SQLite keeps profile text in a standalone FTS5 table whose rowid is the
+# owning user's id, so a profile can be re-indexed with a single rowid
+# lookup. Postgres searches an expression GIN index on core_profile itself
+# and needs no syncing.
+FTS_TABLE = 'core_profile_search'
+PG_VECTOR = "to_tsvector('english', p.bio || ' ' || p.skills || ' ' || p.goals)"
+
+MAX_QUERY_TERMS = 8
+
+def _terms(query):
+    return re.findall(r'\w+', query.lower())[:MAX_QUERY_TERMS]
+
+def index_profile(profile):
+    if connection.vendor != 'sqlite':
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [profile.user_id])
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, bio, skills, goals) VALUES (%s, %s, %s, %s)',
+            [profile.user_id, profile.bio, profile.skills, profile.goals]
+        )
+
+def index_profiles(profiles):
+    """Index freshly created profiles, e.g. after a bulk_create skipped the signals."""
+    if connection.vendor != 'sqlite' or not profiles:
+        return
+
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'INSERT INTO {FTS_TABLE} (rowid, bio, skills, goals) VALUES (%s, %s, %s, %s)',
+            [(p.user_id, p.bio, p.skills, p.goals) for p in profiles]
+        )
+
+def unindex_profile(profile):
+    if connection.vendor != 'sqlite':
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [profile.user_id])
+
+def rebuild_index():
+    if connection.vendor != 'sqlite':
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, bio, skills, goals) '
+            'SELECT user_id, bio, skills, goals FROM core_profile'
+        )
+
+def search_mentors(query, limit, offset = 0):
+    """
+    Return the ids of mentor profiles matching every term of the query,
+    best match first. Terms are prefix-matched so partial words still hit.
+    """
+    terms = _terms(query)
+    if not terms:
+        return []
+
+    if connection.vendor == 'sqlite':
+        # Skills carry twice the weight of bio and goals in the ranking.
+        match = ' '.join(f'"{term}"*' for term in terms)
+        sql = (
+            f'SELECT p.id FROM {FTS_TABLE} f '
+            'JOIN core_profile p ON p.user_id = f.rowid '
+            f"WHERE {FTS_TABLE} MATCH %s AND p.role = 'mentor' "
+            f'ORDER BY bm25({FTS_TABLE}, 1.0, 2.0, 1.0) '
+            'LIMIT %s OFFSET %s'
+        )
+        params = [match, limit, offset]
+
+    elif connection.vendor == 'postgresql':
+        match = ' & '.join(f'{term}:*' for term in terms)
+        sql = (
+            'SELECT p.id FROM core_profile p '
+            f"WHERE p.role = 'mentor' AND {PG_VECTOR} @@ to_tsquery('english', %s) "
+            f"ORDER BY ts_rank({PG_VECTOR}, to_tsquery('english', %s)) DESC "
+            'LIMIT %s OFFSET %s'
+        )
+        params = [match, match, limit, offset]
+
+    else:
+        profiles = Profile.objects.filter(role = 'mentor')
+        for term in terms:
+            profiles = profiles.filter(Q(bio__icontains = term) | Q(skills__icontains = term) | Q(goals__icontains = term))
+        return list(profiles.values_list('id', flat = True)[offset:offset + limit])
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [row[0] for row in cursor.fetchall()]
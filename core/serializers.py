@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
-from .models import Notification, Profile, MentorshipRequest, Session
+from .notifications import notify
+from .models import Notification, Profile, MentorshipRequest, Session, Recommendation
 
 class Register(serializers.ModelSerializer):
     # Define role as a CharField
@@ -24,11 +25,7 @@ class Register(serializers.ModelSerializer):
             role=role_data
         )
 
-        # Create the Notification
-        Notification.objects.create(
-            user=user,
-            text="The admin user has added your user"
-        )
+        notify(user, "The admin user has added your user")
 
         # Set superuser status if admin
         if role_data == "admin":
@@ -40,7 +37,7 @@ class Register(serializers.ModelSerializer):
 class NotificationParser(serializers.ModelSerializer):
     class Meta:
         model = Notification
-        fields = ['id', 'text', 'seen', 'date']
+        fields = ['id', 'text', 'count', 'seen', 'date']
 
 class ProfileSerializer(serializers.ModelSerializer):
 
@@ -78,4 +75,21 @@ class SessionSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Session
-        fields = ['mentee', 'mentor', 'mentorship', 'date', 'feedback', 'rating']
\ No newline at end of file
+        fields = ['mentee', 'mentor', 'mentorship', 'date', 'start', 'end', 'feedback', 'rating']
+
+class MentorSerializer(serializers.ModelSerializer):
+    username = serializers.CharField(source = 'user.username', read_only = True)
+
+    class Meta:
+        model = Profile
+        fields = ['id', 'username', 'bio', 'skills', 'goals']
+
+
+class RecommendationSerializer(serializers.ModelSerializer):
+    mentor_profile_id = serializers.CharField(source = 'mentor.profile.id', read_only = True)
+    mentor_name = serializers.CharField(source = 'mentor.username', read_only = True)
+    skills = serializers.CharField(source = 'mentor.profile.skills', read_only = True)
+
+    class Meta:
+        model = Recommendation
+        fields = ['mentor_profile_id', 'mentor_name', 'skills', 'score', 'rank']
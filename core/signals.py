@@ -0,0 +1,72 @@
+import sys
+from datetime import timedelta
+
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from django.contrib.auth.models import User
+
+from .models import Profile, Availability, AvailabilityRule, Session, Mentorship
+from . import search, directory
+
+# slots (numpy) and authentication (DRF, simplejwt) are imported in the
+# handlers that need them, so connecting signals at startup stays cheap
+
+@receiver(post_save, sender = Profile)
+def index_profile(sender, instance, **kwargs):
+    search.index_profile(instance)
+    directory.profile_changed(instance)
+
+@receiver(post_delete, sender = Profile)
+def unindex_profile(sender, instance, **kwargs):
+    search.unindex_profile(instance)
+    directory.profile_deleted(instance)
+
+@receiver([post_save, post_delete], sender = User)
+@receiver([post_save, post_delete], sender = Profile)
+def invalidate_cached_user(sender, instance, **kwargs):
+    # Nothing can be cached before authentication is first imported
+    authentication = sys.modules.get(f'{__package__}.authentication')
+    if authentication is not None:
+        authentication.user_cache.invalidate(instance.pk if sender is User else instance.user_id)
+
+@receiver([post_save, post_delete], sender = Availability)
+def refresh_availability_bitmap(sender, instance, **kwargs):
+    from . import slots
+
+    if not slots.in_batch():
+        slots.refresh(instance.mentor_id, instance.date)
+
+@receiver([post_save, post_delete], sender = AvailabilityRule)
+def refresh_rule_bitmaps(sender, instance, **kwargs):
+    from . import slots
+
+    # Recomputes the whole window, which also clears removed occurrences
+    slots.refresh_rules([instance.mentor_id])
+
+@receiver(post_init, sender = Session)
+def remember_session_window(sender, instance, **kwargs):
+    # The window as loaded, so moving a session also frees its old days.
+    # Read from __dict__ so deferred fields are not fetched.
+    instance._saved_window = tuple(instance.__dict__.get(name) for name in ('mentorship_id', 'start', 'end'))
+
+@receiver([post_save, post_delete], sender = Session)
+def refresh_session_bitmap(sender, instance, **kwargs):
+    from . import slots
+
+    windows = {(instance.mentorship_id, instance.start, instance.end), instance._saved_window}
+    instance._saved_window = (instance.mentorship_id, instance.start, instance.end)
+
+    for mentorship_id, start, end in windows:
+        if start is None or end is None or mentorship_id is None:
+            continue
+
+        mentor_id = Mentorship.objects.filter(pk = mentorship_id).values_list('mentor_id', flat = True).first()
+        if mentor_id is None:
+            continue
+
+        day = timezone.localdate(start)
+        while day <= timezone.localdate(end):
+            slots.refresh(mentor_id, day)
+            day += timedelta(days = 1)
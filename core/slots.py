@@ -0,0 +1,217 @@
+import math
+from contextlib import contextmanager
+from contextvars import ContextVar
+from itertools import chain
+from datetime import datetime, time, timedelta
+
+import numpy as np
+
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Availability, AvailabilityBitmap, AvailabilityRule, Session
+from . import recurrence
+
+SLOT_MINUTES = 15
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+# Times are entered as HH:MM, so a block running to midnight ends at 23:59
+END_OF_DAY = time(23, 59)
+# Recurring rules are expanded into the bitmaps this many days ahead;
+# extend_slot_bitmaps moves the window forward each day. Searches past a
+# rule's materialized_until expand it on the fly instead.
+RULE_HORIZON_DAYS = 90
+
+# Set while a bulk write refreshes the days it touched itself
+_batched = ContextVar('slots_batched', default = False)
+
+@contextmanager
+def batched():
+    """Skip the per-row refreshes from the model signals inside this block."""
+    token = _batched.set(True)
+    try:
+        yield
+    finally:
+        _batched.reset(token)
+
+def in_batch():
+    return _batched.get()
+
+def _minutes(value):
+    return value.hour * 60 + value.minute + value.second / 60
+
+def slot_range(start, end, inner = True):
+    """
+    Slot indices covered by [start, end). Inner ranges only keep slots that
+    lie completely inside, outer ranges any slot the interval touches. An
+    end of 00:00 or END_OF_DAY and later is midnight at the end of the day.
+    """
+    start_minutes = _minutes(start)
+    end_minutes = 24 * 60 if end == time(0) or end >= END_OF_DAY else _minutes(end)
+    if inner:
+        return math.ceil(start_minutes / SLOT_MINUTES), math.floor(end_minutes / SLOT_MINUTES)
+    return math.floor(start_minutes / SLOT_MINUTES), math.ceil(end_minutes / SLOT_MINUTES)
+
+def day_bounds(day):
+    start = timezone.make_aware(datetime.combine(day, time(0)))
+    return start, start + timedelta(days = 1)
+
+def _clear_booked(free, bookings, day):
+    day_start, day_end = day_bounds(day)
+    for start, end in bookings:
+        start = max(timezone.localtime(start), day_start)
+        end = min(timezone.localtime(end), day_end)
+        first, last = slot_range(start.time(), end.time() if end < day_end else time(0), inner = False)
+        free[first:last] = False
+
+def _days(first_day, last_day):
+    day = first_day
+    while day <= last_day:
+        yield day
+        day += timedelta(days = 1)
+
+def rule_window():
+    """The days rule occurrences are written into the bitmaps for."""
+    today = timezone.localdate()
+    return today, today + timedelta(days = RULE_HORIZON_DAYS)
+
+def build_bitmaps(mentor_id, days):
+    """
+    Free slots of one mentor on each of `days`: one-off blocks and rule
+    occurrences, minus booked sessions.
+    """
+    free = {day: np.zeros(SLOTS_PER_DAY, dtype = bool) for day in days}
+    if not free:
+        return free
+    first_day, last_day = min(free), max(free)
+
+    one_off = Availability.objects.filter(
+        mentor_id = mentor_id, date__in = list(free)
+    ).values_list('date', 'start', 'end')
+    for day, start, end in chain(one_off, recurrence.blocks(mentor_id, first_day, last_day)):
+        if day in free:
+            first, last = slot_range(start, end)
+            free[day][first:last] = True
+
+    range_start, range_end = day_bounds(first_day)[0], day_bounds(last_day)[1]
+    booked = Session.objects.filter(
+        mentorship__mentor_id = mentor_id, start__lt = range_end, end__gt = range_start
+    ).values_list('start', 'end')
+    for start, end in booked:
+        for day in _days(max(timezone.localdate(start), first_day), min(timezone.localdate(end), last_day)):
+            # A session ending at midnight leaves the next day alone
+            if day in free and end > day_bounds(day)[0]:
+                _clear_booked(free[day], [(start, end)], day)
+
+    return free
+
+def refresh_days(mentor_id, days):
+    """Recompute the stored bitmaps of one mentor for the given days only."""
+    days = set(days)
+    packed = {
+        day: np.packbits(bits).tobytes()
+        for day, bits in build_bitmaps(mentor_id, days).items() if bits.any()
+    }
+    AvailabilityBitmap.objects.filter(
+        mentor_id = mentor_id, date__in = list(days)
+    ).exclude(date__in = list(packed)).delete()
+    AvailabilityBitmap.objects.bulk_create(
+        [AvailabilityBitmap(mentor_id = mentor_id, date = day, slots = bits) for day, bits in packed.items()],
+        update_conflicts = True, unique_fields = ['date', 'mentor'], update_fields = ['slots']
+    )
+
+def refresh_range(mentor_id, first_day, last_day):
+    """Recompute the stored bitmaps of one mentor for every day in a range."""
+    refresh_days(mentor_id, _days(first_day, last_day))
+
+def refresh(mentor_id, day):
+    """Recompute the stored bitmap of one mentor for one day."""
+    refresh_range(mentor_id, day, day)
+
+def refresh_rules(mentor_ids = None):
+    """
+    Write rule occurrences over the rolling rule_window() for the given
+    mentors, or every mentor with an active rule, and record how far their
+    rules are stored. Returns the mentor count.
+    """
+    first_day, last_day = rule_window()
+    if mentor_ids is None:
+        mentor_ids = set(recurrence.active_rules(first_day, last_day).values_list('mentor_id', flat = True))
+    for mentor_id in mentor_ids:
+        refresh_range(mentor_id, first_day, last_day)
+    AvailabilityRule.objects.filter(mentor_id__in = mentor_ids).update(materialized_until = last_day)
+    return len(mentor_ids)
+
+def unstored_rule_bitmaps(day):
+    """
+    Free slots on `day` from rule occurrences not stored in the bitmaps,
+    i.e. past their rule's materialized_until, minus booked sessions.
+    """
+    rules = recurrence.active_rules(day, day).filter(
+        Q(materialized_until__isnull = True) | Q(materialized_until__lt = day)
+    )
+    free = {}
+    for rule in rules:
+        if recurrence.occurrences(rule, day, day):
+            first, last = slot_range(rule.start, rule.end)
+            free.setdefault(rule.mentor_id, np.zeros(SLOTS_PER_DAY, dtype = bool))[first:last] = True
+    if not free:
+        return free
+
+    day_start, day_end = day_bounds(day)
+    booked = Session.objects.filter(
+        mentorship__mentor_id__in = list(free), start__lt = day_end, end__gt = day_start
+    ).values_list('mentorship__mentor_id', 'start', 'end')
+    for mentor_id, start, end in booked:
+        _clear_booked(free[mentor_id], [(start, end)], day)
+    return free
+
+def rebuild_all():
+    days = set(Availability.objects.values_list('mentor_id', 'date').distinct())
+    AvailabilityBitmap.objects.all().delete()
+    for mentor_id, day in days:
+        refresh(mentor_id, day)
+    refresh_rules()
+    return AvailabilityBitmap.objects.count()
+
+def free_mentors(day, window_start, window_end, minutes):
+    """
+    Return {mentor id: first free datetime} for every mentor with `minutes`
+    of consecutive free time on `day` inside [window_start, window_end).
+    Reads the stored bitmaps, plus any rule occurrences on days past what
+    refresh_rules has stored for that rule.
+    """
+    needed = math.ceil(minutes / SLOT_MINUTES)
+    first, last = slot_range(window_start, window_end)
+    if needed <= 0 or last - first < needed:
+        return {}
+
+    rows = list(AvailabilityBitmap.objects.filter(date = day).values_list('mentor_id', 'slots'))
+    unstored = unstored_rule_bitmaps(day)
+    if not rows and not unstored:
+        return {}
+
+    mentor_ids = [mentor_id for mentor_id, _ in rows]
+    packed = np.frombuffer(b''.join(bytes(slots) for _, slots in rows), dtype = np.uint8)
+    free = np.unpackbits(packed.reshape(len(rows), SLOTS_PER_DAY // 8), axis = 1).astype(bool)
+    if unstored:
+        stored = set(mentor_ids)
+        extra = [mentor_id for mentor_id in unstored if mentor_id not in stored]
+        free = np.vstack([free, np.zeros((len(extra), SLOTS_PER_DAY), dtype = bool)])
+        mentor_ids += extra
+        row_of = {mentor_id: row for row, mentor_id in enumerate(mentor_ids)}
+        for mentor_id, bits in unstored.items():
+            free[row_of[mentor_id]] |= bits
+    free = free[:, first:last].astype(np.int32)
+
+    # A run of `needed` free slots starts wherever the sliding sum reaches it
+    totals = np.cumsum(np.pad(free, ((0, 0), (1, 0))), axis = 1)
+    runs = (totals[:, needed:] - totals[:, :-needed]) == needed
+
+    hits = np.flatnonzero(runs.any(axis = 1))
+    starts = runs[hits].argmax(axis = 1) + first
+
+    day_start = day_bounds(day)[0]
+    return {
+        mentor_ids[row]: day_start + timedelta(minutes = int(slot) * SLOT_MINUTES)
+        for row, slot in zip(hits, starts)
+    }
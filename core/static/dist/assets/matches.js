@@ -55,4 +55,4 @@ Error generating stack: `+u.message+`
 
           Goals:
           ${dl.goals}
-        `)}else{const dl=await G.json();D(`Error: ${dl.detail||"Could not send request"}`)}}catch{D("Something went wrong")}};return p.jsxs("div",{className:"bg-gradient-to-b from-white to-gray-200 border p-4 rounded-lg flex flex-col items-center shadow mb-4 bg-white",children:[p.jsx("p",{className:"font-bold text-2xl text-purple-800",children:P}),p.jsx("p",{className:"text-gray-600",children:Q}),p.jsx("br",{}),j==="Y"&&p.jsxs("p",{className:"text-sm text-gray-500",children:["Role: ",m]}),p.jsx("p",{className:"text-lg mt-1",children:gl}),p.jsxs("div",{className:"flex flex-row items-center",children:[Z&&p.jsx("button",{onClick:ll,className:"m-2 px-4 py-2 bg-green-700 text-white rounded hover:bg-green-600 transition hover:px-6 transition hover:py-3 transition hover:rounded-lg hover:m-0",children:"Request Mentorship"}),al&&p.jsx("button",{className:"m-2 px-4 py-2 bg-blue-700 text-white rounded hover:bg-blue-600 transition hover:px-6 transition hover:py-3 transition hover:rounded-lg hover:m-0",onClick:()=>w(_),children:"View Profile"})]}),E&&p.jsx("pre",{className:"font-arial mt-2 text-sm text-blue-600",children:E})]})}function Ch(){const[_,P]=mt.useState(""),[Q,m]=mt.useState(""),[j,Z]=mt.useState([]),[al,gl]=mt.useState([]),[R,E]=mt.useState(null),[D,ll]=mt.useState(""),w=localStorage.getItem("access");mt.useEffect(()=>{fetch("/auth/me",{headers:{Authorization:`Bearer ${w}`}}).then(G=>G.json()).then(G=>{P(G.username),m(G.role)})},[]),mt.useEffect(()=>{w&&fetch("/admin/allusers/",{headers:{Authorization:`Bearer ${w}`}}).then(G=>G.json()).then(G=>{Z(G.filter(dl=>dl.role==="mentee")),gl(G.filter(dl=>dl.role==="mentor"))}).catch(console.error)},[w]);const hl=async G=>{const dl=await fetch("/admin/match/",{method:"POST",headers:{"Content-Type":"application/json",Authorization:`Bearer ${w}`},body:JSON.stringify({mentee_id:R.id,mentor_id:G})});if(dl.ok)ll("✅ Matched successfully"),E(null);else{const pl=await dl.json();ll(`❌ ${pl.detail||"Match failed"}`)}};return p.jsxs("div",{children:[p.jsx(Xh,{username:_,role:Q}),p.jsxs("div",{className:"p-4",children:[p.jsx("h1",{className:"text-2xl font-bold mb-4",children:"Manual Matching"}),D&&p.jsx("p",{className:"mb-4 text-green-600",children:D}),R?p.jsxs(p.Fragment,{children:[p.jsxs("h2",{className:"mb-2",children:["Select Mentor for ",R.username]}),al.map(G=>p.jsxs("div",{className:"mb-3 border p-3 rounded",children:[p.jsxs("p",{className:"font-semibold",children:[G.username," (",G.email,")"]}),p.jsx("button",{onClick:()=>hl(G.id),className:"mt-2 px-4 py-2 bg-purple-600 text-white rounded hover:bg-purple-500",children:"Confirm Match"})]},G.id)),p.jsx("button",{onClick:()=>E(null),className:"mt-4 px-4 py-2 bg-gray-500 text-white rounded hover:bg-gray-400",children:"Cancel"})]}):p.jsxs(p.Fragment,{children:[p.jsx("h2",{className:"mb-2",children:"Select a Mentee"}),j.map(G=>p.jsxs("div",{className:"mb-3 border p-3 rounded",children:[p.jsx(Qh,{id:G.id,username:G.username,email:G.email,role:"mentee",showrole:"Y",ProfileViewable:!0,CustomText:"Needs a mentor"}),p.jsx("button",{onClick:()=>E(G),className:"mt-2 px-4 py-2 bg-green-700 text-white rounded hover:bg-green-600",children:"Match"})]},G.id))]})]})]})}function Zh(){return p.jsxs(p.Fragment,{children:[p.jsx(Gh,{}),p.jsx(Ch,{})]})}jh.createRoot(document.getElementById("root")).render(p.jsx(mt.StrictMode,{children:p.jsx(Zh,{})}));
+        `)}else{const dl=await G.json();D(`Error: ${dl.detail||"Could not send request"}`)}}catch{D("Something went wrong")}};return p.jsxs("div",{className:"bg-gradient-to-b from-white to-gray-200 border p-4 rounded-lg flex flex-col items-center shadow mb-4 bg-white",children:[p.jsx("p",{className:"font-bold text-2xl text-purple-800",children:P}),p.jsx("p",{className:"text-gray-600",children:Q}),p.jsx("br",{}),j==="Y"&&p.jsxs("p",{className:"text-sm text-gray-500",children:["Role: ",m]}),p.jsx("p",{className:"text-lg mt-1",children:gl}),p.jsxs("div",{className:"flex flex-row items-center",children:[Z&&p.jsx("button",{onClick:ll,className:"m-2 px-4 py-2 bg-green-700 text-white rounded hover:bg-green-600 transition hover:px-6 transition hover:py-3 transition hover:rounded-lg hover:m-0",children:"Request Mentorship"}),al&&p.jsx("button",{className:"m-2 px-4 py-2 bg-blue-700 text-white rounded hover:bg-blue-600 transition hover:px-6 transition hover:py-3 transition hover:rounded-lg hover:m-0",onClick:()=>w(_),children:"View Profile"})]}),E&&p.jsx("pre",{className:"font-arial mt-2 text-sm text-blue-600",children:E})]})}function Ch(){const[_,P]=mt.useState(""),[Q,m]=mt.useState(""),[j,Z]=mt.useState([]),[al,gl]=mt.useState([]),[R,E]=mt.useState(null),[D,ll]=mt.useState(""),w=localStorage.getItem("access");mt.useEffect(()=>{fetch("/auth/me",{headers:{Authorization:`Bearer ${w}`}}).then(G=>G.json()).then(G=>{P(G.username),m(G.role)})},[]),mt.useEffect(()=>{w&&fetch("/admin/allusers/?all=1",{headers:{Authorization:`Bearer ${w}`}}).then(G=>G.json()).then(G=>{Z(G.filter(dl=>dl.role==="mentee")),gl(G.filter(dl=>dl.role==="mentor"))}).catch(console.error)},[w]);const hl=async G=>{const dl=await fetch("/admin/match/",{method:"POST",headers:{"Content-Type":"application/json",Authorization:`Bearer ${w}`},body:JSON.stringify({mentee_id:R.id,mentor_id:G})});if(dl.ok)ll("✅ Matched successfully"),E(null);else{const pl=await dl.json();ll(`❌ ${pl.detail||"Match failed"}`)}};return p.jsxs("div",{children:[p.jsx(Xh,{username:_,role:Q}),p.jsxs("div",{className:"p-4",children:[p.jsx("h1",{className:"text-2xl font-bold mb-4",children:"Manual Matching"}),D&&p.jsx("p",{className:"mb-4 text-green-600",children:D}),R?p.jsxs(p.Fragment,{children:[p.jsxs("h2",{className:"mb-2",children:["Select Mentor for ",R.username]}),al.map(G=>p.jsxs("div",{className:"mb-3 border p-3 rounded",children:[p.jsxs("p",{className:"font-semibold",children:[G.username," (",G.email,")"]}),p.jsx("button",{onClick:()=>hl(G.id),className:"mt-2 px-4 py-2 bg-purple-600 text-white rounded hover:bg-purple-500",children:"Confirm Match"})]},G.id)),p.jsx("button",{onClick:()=>E(null),className:"mt-4 px-4 py-2 bg-gray-500 text-white rounded hover:bg-gray-400",children:"Cancel"})]}):p.jsxs(p.Fragment,{children:[p.jsx("h2",{className:"mb-2",children:"Select a Mentee"}),j.map(G=>p.jsxs("div",{className:"mb-3 border p-3 rounded",children:[p.jsx(Qh,{id:G.id,username:G.username,email:G.email,role:"mentee",showrole:"Y",ProfileViewable:!0,CustomText:"Needs a mentor"}),p.jsx("button",{onClick:()=>E(G),className:"mt-2 px-4 py-2 bg-green-700 text-white rounded hover:bg-green-600",children:"Match"})]},G.id))]})]})]})}function Zh(){return p.jsxs(p.Fragment,{children:[p.jsx(Gh,{}),p.jsx(Ch,{})]})}jh.createRoot(document.getElementById("root")).render(p.jsx(mt.StrictMode,{children:p.jsx(Zh,{})}));
@@ -55,4 +55,4 @@ Error generating stack: `+u.message+`
 
           Goals:
           ${Dl.goals}
-        `)}else{const Dl=await vl.json();D(`Error: ${Dl.detail||"Could not send request"}`)}}catch{D("Something went wrong")}};return V.jsxs("div",{className:"bg-gradient-to-b from-white to-gray-200 border p-4 rounded-lg flex flex-col items-center shadow mb-4 bg-white",children:[V.jsx("p",{className:"font-bold text-2xl text-purple-800",children:P}),V.jsx("p",{className:"text-gray-600",children:j}),V.jsx("br",{}),B==="Y"&&V.jsxs("p",{className:"text-sm text-gray-500",children:["Role: ",m]}),V.jsx("p",{className:"text-lg mt-1",children:Sl}),V.jsxs("div",{className:"flex flex-row items-center",children:[Q&&V.jsx("button",{onClick:J,className:"m-2 px-4 py-2 bg-green-700 text-white rounded hover:bg-green-600 transition hover:px-6 transition hover:py-3 transition hover:rounded-lg hover:m-0",children:"Request Mentorship"}),ul&&V.jsx("button",{className:"m-2 px-4 py-2 bg-blue-700 text-white rounded hover:bg-blue-600 transition hover:px-6 transition hover:py-3 transition hover:rounded-lg hover:m-0",onClick:()=>W(_),children:"View Profile"})]}),T&&V.jsx("pre",{className:"font-arial mt-2 text-sm text-blue-600",children:T})]})}function Zy(){const _=localStorage.getItem("access"),[P,j]=ou.useState("Unauthenticated"),[m,B]=ou.useState("mentee"),[Q,ul]=ou.useState([]),[Sl,R]=ou.useState([]);return ou.useEffect(()=>{const T=async()=>{const J=await fetch("/auth/me",{method:"GET",headers:{Authorization:`Bearer ${_}`,"Content-Type":"application/json"}});if(J.ok){const W=await J.json();j(W.username),B(W.role)}},D=async()=>{try{const J=await fetch("/admin/allusers/",{method:"GET",headers:{"Content-Type":"application/json"}});if(J.ok){const W=await J.json();ul(W)}}catch(J){console.error(J)}};T(),D()},[]),V.jsxs("div",{children:[V.jsx(Xy,{username:P,role:m}),V.jsx("h1",{className:"text-2xl font-bold text-center border-b-2 border-gray-300 m-[20px]",children:"All Mentors"}),Q.map(T=>T.role==="mentor"?V.jsx(Qy,{id:T.id,username:T.username,email:T.email,role:T.role,showrole:"N",showRequestButton:!0,ProfileViewable:!0}):null)]})}function Cy(){return V.jsxs(V.Fragment,{children:[V.jsx(jy,{}),V.jsx(Zy,{})]})}Gy.createRoot(document.getElementById("root")).render(V.jsx(ou.StrictMode,{children:V.jsx(Cy,{})}));
+        `)}else{const Dl=await vl.json();D(`Error: ${Dl.detail||"Could not send request"}`)}}catch{D("Something went wrong")}};return V.jsxs("div",{className:"bg-gradient-to-b from-white to-gray-200 border p-4 rounded-lg flex flex-col items-center shadow mb-4 bg-white",children:[V.jsx("p",{className:"font-bold text-2xl text-purple-800",children:P}),V.jsx("p",{className:"text-gray-600",children:j}),V.jsx("br",{}),B==="Y"&&V.jsxs("p",{className:"text-sm text-gray-500",children:["Role: ",m]}),V.jsx("p",{className:"text-lg mt-1",children:Sl}),V.jsxs("div",{className:"flex flex-row items-center",children:[Q&&V.jsx("button",{onClick:J,className:"m-2 px-4 py-2 bg-green-700 text-white rounded hover:bg-green-600 transition hover:px-6 transition hover:py-3 transition hover:rounded-lg hover:m-0",children:"Request Mentorship"}),ul&&V.jsx("button",{className:"m-2 px-4 py-2 bg-blue-700 text-white rounded hover:bg-blue-600 transition hover:px-6 transition hover:py-3 transition hover:rounded-lg hover:m-0",onClick:()=>W(_),children:"View Profile"})]}),T&&V.jsx("pre",{className:"font-arial mt-2 text-sm text-blue-600",children:T})]})}function Zy(){const _=localStorage.getItem("access"),[P,j]=ou.useState("Unauthenticated"),[m,B]=ou.useState("mentee"),[Q,ul]=ou.useState([]),[Sl,R]=ou.useState([]);return ou.useEffect(()=>{const T=async()=>{const J=await fetch("/auth/me",{method:"GET",headers:{Authorization:`Bearer ${_}`,"Content-Type":"application/json"}});if(J.ok){const W=await J.json();j(W.username),B(W.role)}},D=async()=>{try{const J=await fetch("/admin/allusers/?all=1",{method:"GET",headers:{"Content-Type":"application/json"}});if(J.ok){const W=await J.json();ul(W)}}catch(J){console.error(J)}};T(),D()},[]),V.jsxs("div",{children:[V.jsx(Xy,{username:P,role:m}),V.jsx("h1",{className:"text-2xl font-bold text-center border-b-2 border-gray-300 m-[20px]",children:"All Mentors"}),Q.map(T=>T.role==="mentor"?V.jsx(Qy,{id:T.id,username:T.username,email:T.email,role:T.role,showrole:"N",showRequestButton:!0,ProfileViewable:!0}):null)]})}function Cy(){return V.jsxs(V.Fragment,{children:[V.jsx(jy,{}),V.jsx(Zy,{})]})}Gy.createRoot(document.getElementById("root")).render(V.jsx(ou.StrictMode,{children:V.jsx(Cy,{})}));
@@ -1,12 +1,32 @@
-from django.test import TestCase
+import asyncio
+import threading
+from unittest import mock, skipUnless
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, connection
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.signals import request_finished, request_started
+from django.db import close_old_connections
+from django.test import AsyncRequestFactory, RequestFactory, SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework.test import APIClient
 from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
 from django.contrib.auth.models import User
-from .models import Profile, MentorshipRequest, Mentorship, Session, Availability
+from . import async_views, authentication, directory, notifications, scheduling, slots, warmup
+from .db.pool import ConnectionPool, PoolTimeout
+from .hashing import HashPool
+from .models import Profile, MentorshipRequest, Mentorship, Session, Availability, AvailabilityBitmap, AvailabilityRule, Notification, Recommendation
 from datetime import datetime, timedelta, time
+from django.utils import timezone
 from django.utils.timezone import make_aware
 import json
+import tempfile
+from io import StringIO
+from django.core.management import call_command
 
 
 class CoreAppTests(TestCase):
@@ -45,6 +65,10 @@ class CoreAppTests(TestCase):
         self.assertEqual(res.status_code, 200)
         self.assertEqual(MentorshipRequest.objects.count(), 1)
 
+        res = self.client.post("/requests/", {"id": self.mentor_user.profile.id}, format="json")
+        self.assertEqual(res.status_code, 409)
+        self.assertEqual(MentorshipRequest.objects.count(), 1)
+
     def test_get_mentee_requests(self):
         MentorshipRequest.objects.create(mentee=self.mentee_user, mentor=self.mentor_user, status="pending")
         self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.mentee_token}")
@@ -112,7 +136,11 @@ class CoreAppTests(TestCase):
         self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.admin_token}")
         res = self.client.get("/admin/allusers/")
         self.assertEqual(res.status_code, 200)
-        self.assertGreaterEqual(len(res.data), 3)
+        self.assertGreaterEqual(len(res.data["results"]), 3)
+
+        with mock.patch("core.pagination.MAX_ALL_ROWS", 2):
+            res = self.client.get("/admin/allusers/", {"all": "1"})
+        self.assertEqual(len(res.data), 2)
 
     def test_delete_notifications(self):
         self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.mentee_token}")
@@ -120,3 +148,803 @@ class CoreAppTests(TestCase):
         res = self.client.delete("/notifications/delete")
         self.assertEqual(res.status_code, 200)
         self.assertEqual(self.mentee_user.notifications.count(), 0)
+
+    def test_search_mentors(self):
+        self.mentor_user.profile.skills = "Python, Django"
+        self.mentor_user.profile.save()
+        self.mentee_user.profile.skills = "Python"
+        self.mentee_user.profile.save()
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.mentee_token}")
+        res = self.client.get("/mentors/search", {"q": "pyth"})
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual([hit["username"] for hit in res.data["results"]], ["mentor"])
+        self.assertFalse(res.data["has_next"])
+
+        res = self.client.get("/mentors/search", {"q": "rust"})
+        self.assertEqual(res.data["results"], [])
+
+    def test_recommendations(self):
+        other_mentor = User.objects.create_user(username="other", password="otherpass")
+        Profile.objects.create(user=other_mentor, role="mentor", skills="Cooking, baking")
+        self.mentor_user.profile.skills = "Python, Django, APIs"
+        self.mentor_user.profile.save()
+        self.mentee_user.profile.goals = "Learn Django and build APIs"
+        self.mentee_user.profile.save()
+
+        call_command("compute_recommendations", "--top-k", "5", stdout=StringIO())
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.mentee_token}")
+        res = self.client.get("/recommendations/")
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual([r["mentor_name"] for r in res.data], ["mentor"])
+        self.assertEqual(res.data[0]["rank"], 1)
+
+    def test_auto_match_respects_capacity(self):
+        second_mentee = User.objects.create_user(username="second", password="secondpass")
+        Profile.objects.create(user=second_mentee, role="mentee", goals="Learn Django")
+        self.mentor_user.profile.skills = "Django"
+        self.mentor_user.profile.capacity = 1
+        self.mentor_user.profile.save()
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.admin_token}")
+        self.admin_user.is_staff = True
+        self.admin_user.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.post("/admin/match/", {"mode": "auto"}, format="json")
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data["matches"], [{"mentee": "second", "mentor": "mentor"}])
+        self.assertEqual(Mentorship.objects.count(), 1)
+        self.assertEqual(self.mentor_user.notifications.count(), 1)
+
+        third_mentee = User.objects.create_user(username="third", password="thirdpass")
+        Profile.objects.create(user=third_mentee, role="mentee", goals="Learn Django")
+        self.mentor_user.profile.capacity = 2
+        self.mentor_user.profile.save()
+        conflict = IntegrityError("mentorship_pair")
+        with mock.patch.object(Mentorship.objects, "bulk_create", side_effect=conflict):
+            res = self.client.post("/admin/match/", {"mode": "auto"}, format="json")
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(Mentorship.objects.count(), 1)
+
+    def test_schedule_session_rejects_overlap(self):
+        mentorship = Mentorship.objects.create(mentee=self.mentee_user, mentor=self.mentor_user)
+        available_date = datetime.now().date()
+        Availability.objects.create(mentor=self.mentor_user, date=available_date, start=time(9, 0), end=time(12, 0))
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.mentee_token}")
+        first = datetime.combine(available_date, time(10, 0)).isoformat()
+        res = self.client.post("/sessions/", {"id": mentorship.id, "date": first}, format="json")
+        self.assertEqual(res.status_code, 200)
+
+        clashing = datetime.combine(available_date, time(10, 30)).isoformat()
+        res = self.client.post("/sessions/", {"id": mentorship.id, "date": clashing}, format="json")
+        self.assertEqual(res.status_code, 409)
+
+        adjacent = datetime.combine(available_date, time(11, 0)).isoformat()
+        res = self.client.post("/sessions/", {"id": mentorship.id, "date": adjacent}, format="json")
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(Session.objects.count(), 2)
+
+    def test_schedule_session_validates_duration_and_allows_midnight_end(self):
+        mentorship = Mentorship.objects.create(mentee=self.mentee_user, mentor=self.mentor_user)
+        day = datetime.now().date()
+        Availability.objects.create(mentor=self.mentor_user, date=day, start=time(22, 0), end=time(23, 59))
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.mentee_token}")
+        late = datetime.combine(day, time(23, 0)).isoformat()
+        for duration in (0, 10**12):
+            res = self.client.post("/sessions/", {"id": mentorship.id, "date": late, "duration": duration}, format="json")
+            self.assertEqual(res.status_code, 400)
+
+        res = self.client.post("/sessions/", {"id": mentorship.id + 1, "date": late}, format="json")
+        self.assertEqual(res.status_code, 404)
+
+        res = self.client.post("/sessions/", {"id": mentorship.id, "date": late}, format="json")
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(timezone.localtime(Session.objects.get().end).time(), time(0))
+
+    def test_free_mentors_search(self):
+        day = datetime.now().date()
+        Availability.objects.create(mentor=self.mentor_user, date=day, start=time(9, 0), end=time(11, 0))
+        mentorship = Mentorship.objects.create(mentee=self.mentee_user, mentor=self.mentor_user)
+        start = make_aware(datetime.combine(day, time(9, 30)))
+        Session.objects.create(mentorship=mentorship, date=day, start=start, end=start + timedelta(minutes=60))
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.mentee_token}")
+        res = self.client.get("/mentors/free", {"date": day.isoformat(), "start": "09:00", "end": "17:00", "duration": 30})
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual([hit["mentor_name"] for hit in res.data], ["mentor"])
+        self.assertEqual(res.data[0]["earliest"].time(), time(9, 0))
+
+        res = self.client.get("/mentors/free", {"date": day.isoformat(), "start": "09:00", "end": "17:00", "duration": 60})
+        self.assertEqual(res.data, [])
+
+    def test_moving_a_session_frees_its_old_day(self):
+        today = datetime.now().date()
+        tomorrow = today + timedelta(days=1)
+        for day in (today, tomorrow):
+            Availability.objects.create(mentor=self.mentor_user, date=day, start=time(23, 0), end=time(23, 59))
+        mentorship = Mentorship.objects.create(mentee=self.mentee_user, mentor=self.mentor_user)
+        start = make_aware(datetime.combine(today, time(23, 0)))
+        session = Session.objects.create(mentorship=mentorship, date=today, start=start, end=start + timedelta(hours=1))
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.mentee_token}")
+        res = self.client.get("/mentors/free", {"date": today.isoformat(), "start": "23:00", "duration": 60})
+        self.assertEqual(res.data, [])
+
+        session = Session.objects.get(pk=session.pk)
+        session.start, session.end, session.date = start + timedelta(days=1), start + timedelta(days=1, hours=1), tomorrow
+        session.save()
+
+        # The whole last hour is free again, up to midnight
+        res = self.client.get("/mentors/free", {"date": today.isoformat(), "start": "23:00", "duration": 60})
+        self.assertEqual([hit["mentor_name"] for hit in res.data], ["mentor"])
+        res = self.client.get("/mentors/free", {"date": tomorrow.isoformat(), "start": "23:00", "duration": 15})
+        self.assertEqual(res.data, [])
+
+    def test_recurring_availability_rule(self):
+        mentorship = Mentorship.objects.create(mentee=self.mentee_user, mentor=self.mentor_user)
+        first_day = datetime.now().date()
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.mentor_token}")
+        res = self.client.post("/availability/rules/", {
+            "rrule": "FREQ=WEEKLY", "dtstart": first_day.isoformat(), "start": "18:00", "end": "20:00"
+        }, format="json")
+        self.assertEqual(res.status_code, 200)
+        rule_id = res.data["id"]
+
+        res = self.client.get("/availability/calendar", {
+            "mentor": self.mentor_user.profile.id,
+            "from": first_day.isoformat(),
+            "to": (first_day + timedelta(days=20)).isoformat()
+        })
+        self.assertEqual(len(res.data), 3)
+
+        next_week = first_day + timedelta(days=7)
+        res = self.client.post(f"/availability/rules/{rule_id}/skip", {"date": next_week.isoformat()}, format="json")
+        self.assertEqual(res.status_code, 200)
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.mentee_token}")
+        requested = datetime.combine(first_day + timedelta(days=14), time(18, 30)).isoformat()
+        res = self.client.post("/sessions/", {"id": mentorship.id, "date": requested}, format="json")
+        self.assertEqual(res.status_code, 200)
+
+        skipped = datetime.combine(next_week, time(18, 30)).isoformat()
+        res = self.client.post("/sessions/", {"id": mentorship.id, "date": skipped}, format="json")
+        self.assertEqual(res.status_code, 400)
+
+        booked_day = (first_day + timedelta(days=14)).isoformat()
+        res = self.client.get("/mentors/free", {"date": booked_day, "start": "17:00", "end": "21:00", "duration": 30})
+        self.assertEqual([hit["mentor_name"] for hit in res.data], ["mentor"])
+        res = self.client.get("/mentors/free", {"date": booked_day, "start": "17:00", "end": "21:00", "duration": 60})
+        self.assertEqual(res.data, [])
+
+        # Stored occurrences are read from the bitmaps; the second query only
+        # looks for rules not stored up to that day
+        with self.assertNumQueries(2):
+            free = slots.free_mentors(first_day + timedelta(days=21), time(17, 0), time(21, 0), 60)
+        self.assertEqual(list(free), [self.mentor_user.id])
+
+        # Past the stored window, or when extend_slot_bitmaps stops running,
+        # occurrences are expanded from the rule
+        beyond = first_day + timedelta(weeks=15)
+        self.assertFalse(AvailabilityBitmap.objects.filter(date=beyond).exists())
+        self.assertEqual(list(slots.free_mentors(beyond, time(17, 0), time(21, 0), 60)), [self.mentor_user.id])
+        AvailabilityRule.objects.update(materialized_until=first_day)
+        AvailabilityBitmap.objects.filter(date__gt=first_day).delete()
+        self.assertEqual(list(slots.free_mentors(first_day + timedelta(days=21), time(17, 0), time(21, 0), 60)), [self.mentor_user.id])
+        self.assertEqual(slots.free_mentors(first_day + timedelta(days=14), time(17, 0), time(21, 0), 60), {})
+
+    def test_bulk_availability_merges_blocks(self):
+        day = datetime.now().date()
+        Availability.objects.create(mentor=self.mentor_user, date=day, start=time(9, 0), end=time(10, 0))
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.mentor_token}")
+        res = self.client.post("/availability/bulk/", {"blocks": [
+            {"date": day.isoformat(), "start": "09:30", "end": "11:00"},
+            {"date": day.isoformat(), "start": "11:00", "end": "12:00"},
+            {"date": day.isoformat(), "start": "14:00", "end": "15:00"},
+        ]}, format="json")
+        self.assertEqual(res.status_code, 200)
+        blocks = list(Availability.objects.filter(mentor=self.mentor_user).order_by("start").values_list("start", "end"))
+        self.assertEqual(blocks, [(time(9, 0), time(12, 0)), (time(14, 0), time(15, 0))])
+
+        res = self.client.post("/availability/bulk/", {"replace": True, "blocks": [
+            {"date": day.isoformat(), "start": "14:00", "end": "15:00"},
+        ]}, format="json")
+        self.assertEqual((res.data["created"], res.data["deleted"]), (0, 1))
+        self.assertEqual(Availability.objects.count(), 1)
+
+    def test_set_availability_keeps_nothing_when_refused(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.mentor_token}")
+        res = self.client.post("/availability/set/", {"date": "9999-12-31", "start": "09:00", "end": "10:00"}, format="json")
+        self.assertEqual(res.status_code, 400)
+
+        day = datetime.now().date().isoformat()
+        with mock.patch.object(slots, "refresh", side_effect=OverflowError("date value out of range")):
+            res = self.client.post("/availability/set/", {"date": day, "start": "09:00", "end": "10:00"}, format="json")
+        self.assertEqual(res.status_code, 400)
+        self.assertFalse(Availability.objects.exists())
+
+    def test_bulk_availability_refreshes_only_touched_days(self):
+        day = datetime.now().date()
+        far = day + timedelta(days=300)
+        blocks = [(day, time(9, 0), time(10, 0)), (far, time(9, 0), time(10, 0))]
+        with mock.patch.object(slots, "build_bitmaps", wraps=slots.build_bitmaps) as build:
+            scheduling.upsert_availability(self.mentor_user, blocks)
+        self.assertEqual(set(build.call_args.args[1]), {day, far})
+        self.assertEqual(AvailabilityBitmap.objects.filter(mentor=self.mentor_user).count(), 2)
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.mentor_token}")
+        for date in ("9999-12-31", "1900-01-01"):
+            res = self.client.post("/availability/bulk/", {"blocks": [
+                {"date": date, "start": "09:00", "end": "10:00"},
+            ]}, format="json")
+            self.assertEqual(res.status_code, 400)
+        self.assertEqual(Availability.objects.count(), 2)
+
+    def test_bulk_availability_queries_do_not_grow_with_rows(self):
+        day = datetime.now().date()
+
+        def replace(count, minute):
+            # `count` separate 5 minute blocks replacing the previous ones
+            blocks = [(day, time(hour, minute), time(hour, minute + 5)) for hour in range(count)]
+            self.assertEqual(scheduling.upsert_availability(self.mentor_user, blocks, replace=True)[0], count)
+
+        replace(5, 0)
+        with CaptureQueriesContext(connection) as queries:
+            replace(5, 10)
+
+        replace(20, 0)
+        with self.assertNumQueries(len(queries)):
+            replace(20, 10)
+
+    def test_request_notifications_are_coalesced(self):
+        second_mentee = User.objects.create_user(username="second", password="secondpass")
+        Profile.objects.create(user=second_mentee, role="mentee")
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.mentee_token}")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post("/requests/", {"id": self.mentor_user.profile.id}, format="json")
+        self.client.force_authenticate(second_mentee)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post("/requests/", {"id": self.mentor_user.profile.id}, format="json")
+
+        received = self.mentor_user.notifications.get()
+        self.assertEqual(received.count, 2)
+        self.assertEqual(received.text, "You received 2 new mentorship requests")
+        self.assertEqual(self.mentee_user.notifications.count(), 1)
+
+    def test_notification_feed_and_unread_counter(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.mentee_token}")
+        with self.captureOnCommitCallbacks(execute=True):
+            for number in range(5):
+                notifications.notify(self.mentee_user, f"Notification {number}")
+
+        res = self.client.get("/notifications/unread")
+        self.assertEqual(res.data["unread"], 5)
+
+        res = self.client.get("/notifications/", {"page_size": 3})
+        self.assertEqual(len(res.data["results"]), 3)
+        first_page = [n["id"] for n in res.data["results"]]
+        res = self.client.get("/notifications/", {"page_size": 3, "cursor": res.data["next"]})
+        self.assertEqual(len(res.data["results"]), 2)
+        self.assertIsNone(res.data["next"])
+        self.assertFalse(set(first_page) & {n["id"] for n in res.data["results"]})
+
+        for ids in (["abc"], [1.5], [True], "1"):
+            res = self.client.post("/notifications/seen", {"ids": ids}, format="json")
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        res = self.client.post("/notifications/seen", {"ids": first_page}, format="json")
+        self.assertEqual(res.data["seen"], 3)
+        res = self.client.get("/users/me")
+        self.assertEqual(res.data["unread"], 2)
+
+    def test_prune_notifications(self):
+        old = timezone.now() - timedelta(days=40)
+        stale = self.mentee_user.notifications.create(text="Old", seen=True)
+        self.mentee_user.notifications.create(text="Recent", seen=True)
+        Notification.objects.filter(pk=stale.pk).update(date=old)
+        for number in range(4):
+            self.mentor_user.notifications.create(text=f"Unseen {number}")
+        Profile.objects.filter(user=self.mentor_user).update(unread_notifications=4)
+
+        call_command("prune_notifications", "--seen-days", "30", "--max-unseen", "2", "--chunk-size", "1", stdout=StringIO())
+
+        self.assertEqual(list(self.mentee_user.notifications.values_list("text", flat=True)), ["Recent"])
+        self.assertEqual(sorted(self.mentor_user.notifications.values_list("text", flat=True)), ["Unseen 2", "Unseen 3"])
+        self.assertEqual(Profile.objects.get(user=self.mentor_user).unread_notifications, 2)
+
+    async def test_notification_stream_pushes_new_notifications(self):
+        res = await self.async_client.get("/notifications/stream")
+        self.assertEqual(res.status_code, 401)
+
+        res = await self.async_client.get("/notifications/stream", {"token": self.mentor_token})
+        self.assertEqual(res["Content-Type"], "text/event-stream")
+        stream = aiter(res.streaming_content)
+        self.assertEqual(await anext(stream), b": connected\n\n")
+
+        await sync_to_async(notifications.flush)([(self.mentor_user.id, "Hello mentor", "")])
+        event = await asyncio.wait_for(anext(stream), 5)
+        self.assertTrue(event.startswith(b"event: notification\n"))
+        self.assertIn(b'"text": "Hello mentor"', event)
+        await stream.aclose()
+
+    def test_notification_stream_under_wsgi(self):
+        # Like a WSGI server; the test's transaction must survive the request
+        for signal in (request_started, request_finished):
+            signal.disconnect(close_old_connections)
+            self.addCleanup(signal.connect, close_old_connections)
+
+        environ = RequestFactory().get("/notifications/stream", {"token": self.mentor_token}).environ
+        statuses = []
+
+        def start(environ):
+            return WSGIHandler()(dict(environ), lambda status, headers, exc_info=None: statuses.append(status))
+
+        body = start(environ)
+        stream = iter(body)
+        self.assertEqual(next(stream), b": connected\n\n")
+
+        # The only stream slot of this process is taken
+        start(environ).close()
+        self.assertEqual(statuses, ["200 OK", "503 Service Unavailable"])
+
+        notifications.flush([(self.mentor_user.id, "Hello mentor", "")])
+        event = next(stream)
+        self.assertTrue(event.startswith(b"event: notification\n"))
+        self.assertIn(b'"text": "Hello mentor"', event)
+        body.close()
+
+        start(environ).close()
+        self.assertEqual(statuses[-1], "200 OK")
+
+    async def test_async_reads_match_sync_views(self):
+        mentorship = await Mentorship.objects.acreate(mentee=self.mentee_user, mentor=self.mentor_user)
+        await Session.objects.acreate(mentorship=mentorship, date=datetime.now().date())
+        await MentorshipRequest.objects.acreate(mentee=self.mentee_user, mentor=self.mentor_user, status="pending")
+        await sync_to_async(notifications.flush)([(self.mentee_user.id, "Hello mentee", "")])
+
+        factory = AsyncRequestFactory()
+        reads = [
+            ("/auth/me", async_views.GetUser, self.mentee_token),
+            ("/users/me", async_views.GetProfile, self.mentee_token),
+            ("/requests/sent/", async_views.GetMenteeRequests, self.mentee_token),
+            ("/requests/received/", async_views.GetMentorRequests, self.mentor_token),
+            ("/sessions/mentee", async_views.GetMenteeSessions, self.mentee_token),
+            ("/sessions/mentor?page_size=1", async_views.GetMentorSessions, self.mentor_token),
+            ("/mentorships/my", async_views.my_mentorships, self.mentee_token),
+        ]
+        for path, view, token in reads:
+            auth = {"Authorization": f"Bearer {token}"}
+            expected = await self.async_client.get(path, headers=auth)
+            res = await view(factory.get(path, headers=auth))
+            self.assertEqual(res.status_code, 200, path)
+            self.assertEqual(json.loads(res.content), json.loads(expected.content), path)
+            self.assertEqual(res.get("ETag"), expected.get("ETag"), path)
+            if res.has_header("ETag"):
+                res = await view(factory.get(path, headers={**auth, "If-None-Match": res["ETag"]}))
+                self.assertEqual(res.status_code, 304, path)
+
+        res = await async_views.GetProfile(factory.get("/users/me"))
+        self.assertEqual(res.status_code, 401)
+
+    def test_token_claims_and_cached_authentication(self):
+        claims = AccessToken(self.mentee_token)
+        self.assertEqual(claims["role"], "mentee")
+        self.assertEqual(claims["profile_id"], self.mentee_user.profile.id)
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.mentee_token}")
+        self.client.get("/auth/me")
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get("/auth/me")
+        self.assertEqual(res.data["role"], "mentee")
+        self.assertEqual(len(queries), 0)
+
+        res = self.client.get("/auth/me", HTTP_IF_NONE_MATCH=res["ETag"])
+        self.assertEqual(res.status_code, 304)
+
+        self.admin_user.is_staff = True
+        self.admin_user.save()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.admin_token}")
+        self.client.put(f"/admin/allusers/{self.mentee_user.id}/role", {"role": "mentor"}, format="json")
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.mentee_token}")
+        res = self.client.get("/auth/me")
+        self.assertEqual(res.data["role"], "mentor")
+
+    def test_login_pool_backpressure(self):
+        pool = HashPool(workers=1, queue_size=0)
+        release = threading.Event()
+        with mock.patch.object(authentication, "login_pool", pool):
+            blocker = threading.Thread(target=pool.run, args=(release.wait,))
+            blocker.start()
+            while pool.metrics()["running"] == 0:
+                release.wait(0.01)
+
+            res = self.client.post("/auth/login/", {"username": "mentee", "password": "menteepass"}, format="json")
+            self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+            self.assertGreaterEqual(int(res["Retry-After"]), 1)
+
+            release.set()
+            blocker.join()
+            res = self.client.post("/auth/login/", {"username": "mentee", "password": "wrong"}, format="json")
+            self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+            res = self.client.post("/auth/login/", {"username": "mentee", "password": "menteepass"}, format="json")
+            self.assertEqual(AccessToken(res.data["access"])["role"], "mentee")
+
+            metrics = pool.metrics()
+            self.assertEqual((metrics["rejected"], metrics["completed"], metrics["queue_depth"]), (1, 3, 0))
+
+    def test_login_pool_leaves_a_request_thread_free(self):
+        pool = HashPool(settings.LOGIN_HASH_WORKERS, settings.LOGIN_HASH_QUEUE)
+        slots = settings.LOGIN_HASH_WORKERS + settings.LOGIN_HASH_QUEUE
+        self.assertLess(slots + settings.NOTIFICATION_WSGI_STREAMS, settings.REQUEST_THREADS)
+
+        # Each blocked login holds one request thread; the test runs on a spare one
+        release = threading.Event()
+        with mock.patch.object(authentication, "login_pool", pool):
+            logins = [threading.Thread(target=pool.run, args=(release.wait,)) for _ in range(slots)]
+            for login in logins:
+                login.start()
+            while pool.metrics()["running"] < settings.LOGIN_HASH_WORKERS:
+                release.wait(0.01)
+
+            res = self.client.post("/auth/login/", {"username": "mentee", "password": "menteepass"}, format="json")
+            self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+            self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.mentee_token}")
+            self.assertEqual(self.client.get("/users/me").status_code, 200)
+
+            release.set()
+            for login in logins:
+                login.join()
+
+    def test_warmup_primes_caches_and_drops_connections(self):
+        cache.clear()
+        with mock.patch.object(warmup.connections, "close_all") as close_all:
+            warmup.warm()
+        close_all.assert_called_once()
+        self.assertIn(b'"username": "mentor"', directory.snapshot_body())
+
+    def test_startup_budget_and_lazy_imports(self):
+        # Import plus the first response measures about 600 ms here; the
+        # budget leaves room for a busy machine, not for a heavy new import
+        out = StringIO()
+        call_command("profile_startup", "--top", "1000", "--budget-ms", "1500", stdout=out)
+        self.assertIn("within the 1500 ms budget", out.getvalue())
+        self.assertIn("GET /auth/me", out.getvalue())
+
+        breakdown = out.getvalue().split("\n\n")[0].splitlines()[1:]
+        packages = {line.split()[0] for line in breakdown}
+        self.assertIn("django", packages)
+        self.assertFalse(packages & {"numpy", "scipy", "dateutil", "pandas"})
+
+    def test_bulk_user_import(self):
+        self.admin_user.is_staff = True
+        self.admin_user.save()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.admin_token}")
+
+        rows = [
+            {"username": "student1", "email": "s1@example.com", "password": "pass1", "role": "mentee"},
+            {"username": "mentor", "email": "", "password": "pass2", "role": "mentee"},
+            {"username": "student3", "email": "s3@example.com", "password": "", "role": "teacher"},
+        ]
+        res = self.client.post("/admin/users/import", rows, format="json")
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual([error["row"] for error in res.data["errors"]], [2, 3])
+        self.assertFalse(User.objects.filter(username="student1").exists())
+
+        with self.settings(IMPORT_MAX_ROWS=2):
+            res = self.client.post("/admin/users/import", rows, format="json")
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("import_users command", res.data["detail"])
+
+        body = "username,email,password,role\nstudent1,s1@example.com,pass1,mentee\nteacher1,,pass2,mentor\n"
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.generic("POST", "/admin/users/import", body, content_type="text/csv")
+        self.assertEqual(res.data, {"created": 2})
+
+        student = User.objects.get(username="student1")
+        self.assertTrue(student.check_password("pass1"))
+        self.assertEqual(User.objects.get(username="teacher1").profile.role, "mentor")
+        self.assertEqual(student.notifications.get().text, "The admin user has added your user")
+        self.assertEqual(Profile.objects.get(user=student).unread_notifications, 1)
+
+        path = self.enterContext(tempfile.TemporaryDirectory()) + "/cohort.json"
+        with open(path, "w") as f:
+            json.dump({"users": [
+                {"username": "cohort1", "password": "pw1", "role": "mentee"},
+                {"username": "cohort2", "password": "pw2", "role": "mentee"},
+            ]}, f)
+        out = StringIO()
+        call_command("import_users", path, "--workers", "2", stdout=out)
+        self.assertIn("Imported 2 users", out.getvalue())
+        self.assertTrue(User.objects.get(username="cohort2").check_password("pw2"))
+
+class QueryBudgetTests(TestCase):
+    """
+    Every list endpoint must run a fixed number of queries however many
+    rows it returns. Each endpoint is hit with a few rows, then with more,
+    and the query counts must match and stay within its budget.
+    """
+
+    budgets = {
+        ("get", "/requests/sent/"): 3,
+        ("get", "/requests/received/"): 3,
+        ("get", "/sessions/mentee"): 3,
+        ("get", "/sessions/mentor"): 3,
+        ("post", "/sessions/all"): 3,
+        ("get", "/mentorships/my"): 3,
+        ("get", "/admin/allusers/"): 3,
+        ("get", "/notifications/"): 3,
+        ("get", "/recommendations/"): 3,
+        ("get", "/users/me"): 4,
+    }
+
+    def setUp(self):
+        self.client = APIClient()
+        self.mentor = self.make_user("mentor", "mentor")
+        self.mentee = self.make_user("mentee", "mentee")
+        self.admin = self.make_user("admin", "admin", is_staff=True)
+        self.created = 0
+
+    def make_user(self, username, role, **extra):
+        user = User.objects.create(username=username, **extra)
+        Profile.objects.create(user=user, role=role)
+        return user
+
+    def add_rows(self, count):
+        for _ in range(count):
+            self.created += 1
+            other_mentor = self.make_user(f"mentor{self.created}", "mentor")
+            other_mentee = self.make_user(f"mentee{self.created}", "mentee")
+
+            MentorshipRequest.objects.create(mentee=self.mentee, mentor=other_mentor, status="pending")
+            MentorshipRequest.objects.create(mentee=other_mentee, mentor=self.mentor, status="pending")
+
+            as_mentee = Mentorship.objects.create(mentee=self.mentee, mentor=other_mentor)
+            as_mentor = Mentorship.objects.create(mentee=other_mentee, mentor=self.mentor)
+            Session.objects.create(mentorship=as_mentee, date=datetime.now().date())
+            Session.objects.create(mentorship=as_mentor, date=datetime.now().date())
+
+            Notification.objects.create(user=self.mentee, text="note")
+            Recommendation.objects.create(mentee=self.mentee, mentor=other_mentor, score=1.0, rank=self.created)
+
+    def count_queries(self, method, url):
+        user = self.admin if url in ("/sessions/all", "/admin/allusers/") else (
+            self.mentor if url in ("/requests/received/", "/sessions/mentor") else self.mentee
+        )
+        self.client.force_authenticate(user)
+        with CaptureQueriesContext(connection) as queries:
+            res = getattr(self.client, method)(url)
+        self.assertEqual(res.status_code, 200, url)
+        return len(queries)
+
+    def test_list_endpoints_have_constant_query_counts(self):
+        self.add_rows(2)
+        few = {endpoint: self.count_queries(*endpoint) for endpoint in self.budgets}
+
+        self.add_rows(5)
+        many = {endpoint: self.count_queries(*endpoint) for endpoint in self.budgets}
+
+        for endpoint, budget in self.budgets.items():
+            with self.subTest(endpoint=endpoint):
+                self.assertEqual(many[endpoint], few[endpoint])
+                self.assertLessEqual(many[endpoint], budget)
+
+    def test_list_endpoints_cursor_pagination(self):
+        self.add_rows(5)
+        self.client.force_authenticate(self.admin)
+
+        seen = []
+        cursor = None
+        while True:
+            params = {"page_size": 2} if cursor is None else {"page_size": 2, "cursor": cursor}
+            res = self.client.get("/admin/allusers/", params)
+            self.assertEqual(res.status_code, 200)
+            self.assertLessEqual(len(res.data["results"]), 2)
+            seen.extend(user["username"] for user in res.data["results"])
+            cursor = res.data["next"]
+            if cursor is None:
+                break
+        self.assertEqual(len(seen), User.objects.count())
+        self.assertEqual(len(set(seen)), len(seen))
+
+        res = self.client.get("/admin/allusers/", {"cursor": "not-a-cursor"})
+        self.assertEqual(res.status_code, 400)
+
+        self.client.force_authenticate(self.mentee)
+        res = self.client.get("/sessions/mentee", {"page_size": 3})
+        self.assertEqual(len(res.data["results"]), 3)
+        res = self.client.get("/sessions/mentee", {"page_size": 3, "cursor": res.data["next"]})
+        self.assertEqual(len(res.data["results"]), 2)
+        self.assertIsNone(res.data["next"])
+
+    def test_streaming_exports(self):
+        self.add_rows(3)
+        self.client.force_authenticate(self.admin)
+
+        res = self.client.get("/admin/export/users.ndjson")
+        self.assertEqual(res.status_code, 200)
+        self.assertTrue(res.streaming)
+        rows = [json.loads(line) for line in b"".join(res.streaming_content).decode().splitlines()]
+        self.assertEqual(len(rows), User.objects.count())
+        self.assertEqual(rows[0]["role"], "mentor")
+
+        res = self.client.get("/admin/export/sessions.csv")
+        lines = b"".join(res.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], "id,mentorship,mentee,mentor,date,start,end,feedback,rating")
+        self.assertEqual(len(lines), Session.objects.count() + 1)
+
+        self.client.force_authenticate(self.mentee)
+        self.assertEqual(self.client.get("/admin/export/users.csv").status_code, 403)
+
+    def test_conditional_get_with_user_version(self):
+        self.add_rows(2)
+        self.client.force_authenticate(self.mentee)
+
+        res = self.client.get("/sessions/mentee")
+        etag = res["ETag"]
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get("/sessions/mentee", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, 304)
+        self.assertEqual(len(queries), 1)
+
+        self.assertNotEqual(self.client.get("/users/me")["ETag"], etag)
+
+        self.client.put("/users/me/profile", {"bio": "New", "skills": "", "goals": ""}, format="json")
+        res = self.client.get("/sessions/mentee", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, 200)
+        self.assertNotEqual(res["ETag"], etag)
+
+    def test_mentor_directory_snapshot(self):
+        cache.clear()
+        self.client.force_authenticate(self.mentee)
+        res = self.client.get("/mentors/directory")
+        self.assertEqual([m["username"] for m in res.json()], ["mentor"])
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get("/mentors/directory")
+        self.assertEqual(len(queries), 0)
+        expires = cache.get(directory.CACHE_KEY)["expires"]
+
+        new_mentor = self.make_user("another", "mentee")
+        self.client.force_authenticate(self.admin)
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.put(f"/admin/allusers/{new_mentor.id}/role", {"role": "mentor"}, format="json")
+        self.assertEqual(res.status_code, 200)
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get("/mentors/directory")
+        self.assertEqual(len(queries), 0)
+        self.assertEqual([m["username"] for m in res.json()], ["another", "mentor"])
+        # Patching leaves the expiry where the rebuild set it
+        self.assertEqual(cache.get(directory.CACHE_KEY)["expires"], expires)
+
+        # A change counted elsewhere but not patched in yet forces a rebuild,
+        # and a patch that doesn't follow on from the cached copy drops it
+        cache.incr(directory.VERSION_KEY)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get("/mentors/directory")
+        self.assertEqual(len(queries), 1)
+        cache.incr(directory.VERSION_KEY)
+        directory._apply(new_mentor.profile.id, None)
+        self.assertIsNone(cache.get(directory.CACHE_KEY))
+
+        # A rebuilt copy expires on schedule too
+        self.client.get("/mentors/directory")
+        rebuilt = cache.get(directory.CACHE_KEY)["expires"]
+        with mock.patch.object(directory.time, "time", return_value=rebuilt):
+            with CaptureQueriesContext(connection) as queries:
+                self.client.get("/mentors/directory")
+        self.assertEqual(len(queries), 1)
+
+
+class ConnectionPoolTests(SimpleTestCase):
+    class FakeConnection:
+        def __init__(self):
+            self.closed = False
+            self.healthy = True
+
+        def close(self):
+            self.closed = True
+
+    @staticmethod
+    def reset(connection):
+        if connection.closed:
+            raise ConnectionError("closed")
+
+    def make_pool(self, **options):
+        return ConnectionPool(
+            self.FakeConnection, max_size=2, timeout=0.05,
+            check=lambda connection: connection.healthy, reset=self.reset, **options
+        )
+
+    def test_reuses_and_bounds_connections(self):
+        pool = self.make_pool()
+        first = pool.acquire()
+        pool.release(first)
+        self.assertIs(pool.acquire(), first)
+
+        second = pool.acquire()
+        with self.assertRaises(PoolTimeout):
+            pool.acquire()
+
+        second.close()
+        pool.release(second)
+        self.assertIsNot(pool.acquire(), second)
+        metrics = pool.metrics()
+        self.assertEqual((metrics["size"], metrics["created"], metrics["discarded"], metrics["timeouts"]), (2, 3, 1, 1))
+
+    def test_health_check_and_fork_drop_stale_connections(self):
+        pool = self.make_pool(check_after=0)
+        stale = pool.acquire()
+        pool.release(stale)
+        stale.healthy = False
+        fresh = pool.acquire()
+        self.assertIsNot(fresh, stale)
+        self.assertTrue(stale.closed)
+        self.assertEqual(pool.metrics()["failed_checks"], 1)
+
+        pool.release(fresh)
+        pool._pid = -1
+        self.assertIsNot(pool.acquire(), fresh)
+        self.assertFalse(fresh.closed)
+
+
+class SqliteProductionTests(SimpleTestCase):
+    def test_pragmas_and_serialized_writes(self):
+        from .db.sqlite.base import DatabaseWrapper
+        from .management.commands import benchmark_sqlite
+
+        with tempfile.TemporaryDirectory() as directory:
+            settings_dict = benchmark_sqlite._settings("core.db.sqlite", f"{directory}/db.sqlite3")
+            wrapper = DatabaseWrapper(settings_dict, "pragmas")
+            with wrapper.cursor() as cursor:
+                cursor.execute("PRAGMA journal_mode")
+                self.assertEqual(cursor.fetchone()[0], "wal")
+                cursor.execute("PRAGMA synchronous")
+                self.assertEqual(cursor.fetchone()[0], 1)
+                cursor.execute("PRAGMA busy_timeout")
+                self.assertEqual(cursor.fetchone()[0], 5000)
+            wrapper.close()
+
+            # Concurrent read-then-write transactions queue instead of
+            # failing with "database is locked"
+            settings_dict = benchmark_sqlite._settings("core.db.sqlite", f"{directory}/bench.sqlite3")
+            _, writes, errors = benchmark_sqlite._run(settings_dict, readers=2, writers=4, seconds=0.5, users=5)
+            self.assertTrue(writes)
+            self.assertEqual(errors, 0)
+            self.assertFalse(DatabaseWrapper(settings_dict, "pragmas").writer.locked())
+
+
+@skipUnless(connection.vendor == "sqlite", "Checks SQLite query plans")
+class HotQueryIndexTests(TestCase):
+    def test_hot_queries_use_indexes(self):
+        start = timezone.now()
+        end = start + timedelta(hours=1)
+        queries = {
+            "availability": Availability.objects.filter(mentor_id=1, date=start.date()).values_list("start", "end"),
+            "covering availability": scheduling.covering_availability(1, start, end),
+            "mentee sessions": Session.objects.filter(mentorship__mentee=1).select_related("mentorship__mentor"),
+            "mentor sessions": Session.objects.filter(mentorship__mentor=1).select_related("mentorship__mentee"),
+            "session clashes": scheduling.overlapping_sessions(1, start, end),
+            "received requests": MentorshipRequest.objects.filter(mentor=1).order_by("created_at", "id"),
+            "pending pair": MentorshipRequest.objects.filter(mentor=1, mentee=2, status="pending"),
+            "latest notifications": Notification.objects.filter(user=1).order_by("-date", "-id")[:5],
+            "unseen notifications": Notification.objects.filter(user=1, seen=False),
+            "mentorships": Mentorship.objects.filter(mentee=1).select_related("mentor"),
+        }
+        for name, queryset in queries.items():
+            with self.subTest(name):
+                # EXPLAIN QUERY PLAN: a SEARCH or SCAN line per table visited
+                plan = queryset.explain()
+                self.assertNotRegex(plan, r"\bSCAN core_")
+                self.assertRegex(plan, r"SEARCH core_\w+ USING (COVERING )?INDEX")
+
+        self.assertIn("notification_unseen", queries["unseen notifications"].explain())
+        self.assertIn("request_pending_pair", queries["pending pair"].explain())
+        self.assertIn("COVERING INDEX availability_mentor_day", queries["availability"].explain())
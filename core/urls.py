@@ -1,7 +1,11 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import views, async_views
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
+# Under ASGI the hot per-user reads are served by their native async versions
+reads = async_views if settings.ASYNC_READS else views
+
 urlpatterns = [
 	path('', views.HomePage, name='home-page'),
     path('login/', views.LogIn, name='log-in'),
@@ -15,6 +19,9 @@ urlpatterns = [
     path('admin/session', views.sessions, name = 'admin-sessions'),
 
     path('mentors/', views.Mentors, name = 'all-mentors'),
+    path('mentors/directory', views.MentorDirectory, name = 'mentor-directory'),
+    path('mentors/search', views.SearchMentors, name = 'search-mentors'),
+    path('mentors/free', views.FreeMentors, name = 'free-mentors'),
     path('my-requests/', views.MyRequests, name = 'mentor-requests'),
     path('my-sessions/', views.MySessions, name = 'mentor-sessions'),
 
@@ -25,29 +32,41 @@ urlpatterns = [
     path('auth/register', views.RegisterUser.as_view(), name = 'register-user'),
 	path('auth/login/', TokenObtainPairView.as_view(), name="obtain-token"),
 	path('auth/login/refresh/', TokenRefreshView.as_view(), name="refresh-token"),
-    path('auth/me', views.GetUser, name='get-user'),
+    path('auth/me', reads.GetUser, name='get-user'),
 
-    path('users/me', views.GetProfile, name='get-user-profile'),
+    path('users/me', reads.GetProfile, name='get-user-profile'),
     path('users/<str:id>', views.GetId, name = 'get-profile-by-id'),
     path('users/me/profile', views.UpdateProfile, name = 'update-user-profile'),
 
     path('requests/', views.SendRequest.as_view(), name = 'send-mentorship-request'),
-    path('requests/sent/', views.GetMenteeRequests, name = 'get-mentee-requests'),
-    path('requests/received/', views.GetMentorRequests, name = 'get-mentor-requests'),
+    path('requests/sent/', reads.GetMenteeRequests, name = 'get-mentee-requests'),
+    path('requests/received/', reads.GetMentorRequests, name = 'get-mentor-requests'),
     path('requests/<str:id>/', views.UpdateStatus, name = 'update-request-status'),
 
     path('sessions/', views.ScheduleSession, name = 'schedule-session'),
-    path('sessions/mentee', views.GetMenteeSessions, name = 'get-mentee-sessions'),
-    path('sessions/mentor', views.GetMentorSessions, name = 'get-mentor-sessions'),
+    path('sessions/mentee', reads.GetMenteeSessions, name = 'get-mentee-sessions'),
+    path('sessions/mentor', reads.GetMentorSessions, name = 'get-mentor-sessions'),
     path('sessions/<str:id>/feedback', views.SubmitFeedback, name = 'submit-feedback'),
     path('sessions/all', views.GetAllSessions, name = 'get-all-sessions'),
 
     path('admin/allusers/', views.ListAllUsers, name = 'list-all-users'),
     path('admin/allusers/<str:id>/role', views.UpdateUserRole, name = 'update-user-role'),
     path('admin/match/', views.ManualMatch, name = 'match-manually'),
+    path('admin/users/import', views.ImportUsers, name = 'import-users'),
+    path('admin/metrics', views.Metrics, name = 'metrics'),
+    path('admin/export/<str:table>.<str:fmt>', views.ExportTable, name = 'export-table'),
 
     path('availability/set/', views.set_availability, name='set-availability'),
+    path('availability/bulk/', views.bulk_set_availability, name='bulk-set-availability'),
+    path('availability/rules/', views.set_availability_rule, name='set-availability-rule'),
+    path('availability/rules/<str:id>/skip', views.skip_availability_rule, name='skip-availability-rule'),
+    path('availability/calendar', views.availability_calendar, name='availability-calendar'),
 
+    path('notifications/', views.ListNotifications, name = 'list-notifications'),
+    path('notifications/stream', views.NotificationStream, name = 'notification-stream'),
+    path('notifications/unread', views.UnreadNotifications, name = 'unread-notifications'),
+    path('notifications/seen', views.MarkNotificationsSeen, name = 'mark-notifications-seen'),
     path('notifications/delete', views.DeleteNotifications, name = 'delete-notifications'),
-    path('mentorships/my', views.my_mentorships, name = 'get-mentee-mentorships'),
+    path('recommendations/', views.GetRecommendations, name = 'get-recommendations'),
+    path('mentorships/my', reads.my_mentorships, name = 'get-mentee-mentorships'),
 ]
\ No newline at end of file
@@ -1,9 +1,20 @@
+import asyncio
+import json
+import threading
+from queue import Empty
+from time import monotonic
+
 from dateutil import parser as date_parser
-from datetime import datetime
+from datetime import datetime, time
 
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
 from django.shortcuts import render, get_object_or_404
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
 from django.contrib.auth.decorators import login_required
+from django.utils import timezone
 
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
@@ -11,9 +22,34 @@ from rest_framework.views import Response, APIView
 from rest_framework.parsers import JSONParser
 from rest_framework import status
 from rest_framework.status import HTTP_200_OK
-
-from .serializers import *
-from .models import Profile, Notification, MentorshipRequest, Mentorship, Session, Availability
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.exceptions import InvalidToken
+
+from .serializers import (
+	Register, NotificationParser, ProfileSerializer, UserSerializer, MentorshipReqSerializer, StatusSerializer,
+	SessionSerializer, MentorSerializer, RecommendationSerializer
+)
+from .authentication import CachedJWTAuthentication, login_pool
+from .db.pool import pools as db_pools
+from .notifications import notify
+from .models import Profile, Notification, MentorshipRequest, Mentorship, Session, Availability, AvailabilityRule, Recommendation
+from . import search, scheduling, slots, recurrence, notifications, pagination, events, etags, directory
+# matching (numpy/scipy), exports and imports are only needed by admin
+# endpoints and are imported inside them to keep worker startup lean
+
+SEARCH_PAGE_SIZE = 20
+MAX_AVAILABILITY_BLOCKS = 1000
+PROFILE_NOTIFICATIONS = 20
+STREAM_KEEPALIVE_SECONDS = 15
+# WSGI streams close after this long and the EventSource reconnects
+STREAM_MAX_SECONDS = 300
+
+# Stable keyset orderings for cursor-paginated lists, unique column last
+REQUEST_ORDERING = ('created_at', 'id')
+SESSION_ORDERING = ('date', 'id')
+MAX_SEARCH_PAGE_SIZE = 100
+
+_wsgi_streams = threading.BoundedSemaphore(settings.NOTIFICATION_WSGI_STREAMS)
 
 def HomePage(request):
 	return render(request, "index.html")
@@ -62,24 +98,29 @@ def sessions(request):
 def GetUser(request):
 	username = request.user.username
 	role = request.user.profile.role
-	return Response({'username': username, 'role': role}, status = status.HTTP_200_OK)
+	# Everything here comes from the cached user, so tag the content itself
+	# rather than paying a version lookup
+	return etags.content_response(request, {'username': username, 'role': role})
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@etags.user_etag
 def GetProfile(request):
 	user = request.user
 	username = user.username
 
-	profile = user.profile
+	# Read fresh: the cached user's profile may predate counter updates
+	profile = Profile.objects.get(user = user)
 	role = profile.role
 	bio = profile.bio
 	skills = profile.skills
 	goals = profile.goals
 
-	notifications = user.notifications.all()
-	serializer = NotificationParser(notifications, many = True)
+	# Only the newest notifications; the full history is paged via notifications/
+	latest = user.notifications.order_by('-date', '-id')[:PROFILE_NOTIFICATIONS]
+	serializer = NotificationParser(latest, many = True)
 
-	return Response({'username': username, 'role': role, 'bio': bio, 'skills': skills, 'goals': goals, 'notifications': serializer.data}, status = status.HTTP_200_OK)
+	return Response({'username': username, 'role': role, 'bio': bio, 'skills': skills, 'goals': goals, 'notifications': serializer.data, 'unread': profile.unread_notifications}, status = status.HTTP_200_OK)
 
 @api_view(['GET'])
 def GetId(request, id):
@@ -88,6 +129,75 @@ def GetId(request, id):
 	serializer = ProfileSerializer(profile)
 	return Response(serializer.data, status = status.HTTP_200_OK)
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def MentorDirectory(request):
+	# The snapshot is stored pre-rendered, so skip DRF's renderer entirely
+	return HttpResponse(directory.snapshot_body(), content_type = 'application/json')
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def SearchMentors(request):
+	query = request.query_params.get('q', '')
+
+	try:
+		page = max(int(request.query_params.get('page', 1)), 1)
+		page_size = min(max(int(request.query_params.get('page_size', SEARCH_PAGE_SIZE)), 1), MAX_SEARCH_PAGE_SIZE)
+	except ValueError:
+		return Response({"detail": "page and page_size must be integers."}, status = status.HTTP_400_BAD_REQUEST)
+
+	# Fetch one extra hit to know whether another page exists
+	ids = search.search_mentors(query, page_size + 1, (page - 1) * page_size)
+	has_next = len(ids) > page_size
+	ids = ids[:page_size]
+
+	profiles = Profile.objects.select_related('user').in_bulk(ids)
+	serializer = MentorSerializer([profiles[pk] for pk in ids if pk in profiles], many = True)
+
+	return Response({'results': serializer.data, 'page': page, 'has_next': has_next}, status = status.HTTP_200_OK)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def FreeMentors(request):
+	params = request.query_params
+
+	try:
+		day = datetime.strptime(params['date'], '%Y-%m-%d').date()
+		window_start = datetime.strptime(params.get('start', '00:00'), '%H:%M').time()
+		# 24:00 is midnight at the end of the day, which slots take as time(0)
+		end = params.get('end', '24:00')
+		window_end = time(0) if end == '24:00' else datetime.strptime(end, '%H:%M').time()
+		minutes = int(params.get('duration', scheduling.DEFAULT_SESSION_MINUTES))
+	except (KeyError, ValueError):
+		return Response({"detail": "Expected date=YYYY-MM-DD, start/end=HH:MM and duration in minutes."}, status = status.HTTP_400_BAD_REQUEST)
+
+	try:
+		scheduling.check_availability_date(day)
+	except ValueError as error:
+		return Response({"detail": str(error)}, status = status.HTTP_400_BAD_REQUEST)
+
+	free = slots.free_mentors(day, window_start, window_end, minutes)
+	profiles = Profile.objects.filter(user_id__in = free).select_related('user')
+
+	data = sorted((
+		{
+			'mentor_profile_id': profile.id,
+			'mentor_name': profile.user.username,
+			'earliest': free[profile.user_id]
+		}
+		for profile in profiles
+	), key = lambda hit: (hit['earliest'], hit['mentor_name']))
+
+	return Response(data, status = status.HTTP_200_OK)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def GetRecommendations(request):
+	recommendations = Recommendation.objects.filter(mentee = request.user).select_related('mentor__profile').order_by('rank')
+	serializer = RecommendationSerializer(recommendations, many = True)
+
+	return Response(serializer.data, status = status.HTTP_200_OK)
+
 @api_view(['PUT'])
 @permission_classes([IsAuthenticated])
 def UpdateProfile(request):
@@ -103,12 +213,10 @@ def UpdateProfile(request):
 		user_profile.bio = details['bio']
 		user_profile.skills = details['skills']
 		user_profile.goals = details['goals']
-		user_profile.save()
+		user_profile.save(update_fields = ['bio', 'skills', 'goals'])
+		etags.bump(user)
 
-		Notification.objects.create(
-			user = user,
-			text = "You updated your profile"
-		)
+		notify(user, "You updated your profile", kind = 'profile_updated')
 		return Response(serializer.data, status.HTTP_200_OK)
 
 class RegisterUser(APIView):
@@ -123,13 +231,44 @@ class RegisterUser(APIView):
 		if serializer.is_valid(raise_exception = True):
 			user = serializer.save()
 
-			Notification.objects.create(
-				user = request.user,
-				text = f"You added the user {user.username}"
-			)
+			notify(request.user, f"You added the user {user.username}")
 
 			return Response(serializer.data, status = status.HTTP_200_OK)
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated, IsAdminUser])
+def ImportUsers(request):
+	"""
+	Create a small batch of users from a JSON list, a text/csv body or an
+	uploaded .csv/.json file. Larger cohorts go through `manage.py import_users`.
+	"""
+	from . import imports
+
+	try:
+		if request.content_type.startswith('text/csv'):
+			rows = imports.rows_from_csv(request.body)
+		elif request.content_type.startswith('multipart/'):
+			upload = request.FILES.get('file')
+			if upload is None:
+				return Response({"detail": "No file uploaded."}, status = status.HTTP_400_BAD_REQUEST)
+			rows = imports.load(upload.read(), 'csv' if upload.name.lower().endswith('.csv') else 'json')
+		else:
+			rows = imports.rows_from_json(request.data)
+
+		if len(rows) > settings.IMPORT_MAX_ROWS:
+			return Response(
+				{"detail": f"At most {settings.IMPORT_MAX_ROWS} users per request, use the import_users command for larger imports."},
+				status = status.HTTP_400_BAD_REQUEST
+			)
+
+		users = imports.import_users(rows, admin = request.user, workers = settings.IMPORT_HASH_WORKERS)
+	except imports.InvalidImport as error:
+		return Response({"detail": "Nothing was imported.", "errors": error.errors}, status = status.HTTP_400_BAD_REQUEST)
+	except (UnicodeDecodeError, ValueError):
+		return Response({"detail": "Could not parse the import file."}, status = status.HTTP_400_BAD_REQUEST)
+
+	return Response({"created": len(users)}, status = status.HTTP_200_OK)
+
 class SendRequest(APIView):
 	permission_classes = [IsAuthenticated]
 
@@ -139,40 +278,47 @@ class SendRequest(APIView):
 		mentor_profile = get_object_or_404(Profile, pk = request.data.get("id"))
 		mentor = mentor_profile.user
 
-		MentorshipRequest.objects.create(
-			mentee = mentee,
-			mentor = mentor,
-			status = 'pending'
-		)
+		try:
+			with transaction.atomic():
+				MentorshipRequest.objects.create(
+					mentee = mentee,
+					mentor = mentor,
+					status = 'pending'
+				)
+		except IntegrityError:
+			return Response({"detail": "You already have a pending request to this mentor."}, status = status.HTTP_409_CONFLICT)
+		etags.bump(mentee, mentor)
 
-		Notification.objects.create(
-			user = request.user,
-			text = f"You sent a mentorship request to the mentor {mentor.username}"
-		)
+		notify(request.user, f"You sent a mentorship request to the mentor {mentor.username}")
 
-		Notification.objects.create(
-			user = mentor,
-			text = f"You received a mentorship request from {request.user.username}"
-		)
+		notify(mentor, f"You received a mentorship request from {request.user.username}", kind = 'request_received')
 
 		return Response({"Success": "successful"}, status = status.HTTP_200_OK)
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@etags.user_etag
 def GetMenteeRequests(request):
 	mentee = request.user
 
-	all_requests = mentee.mentee_request.all()
+	all_requests = mentee.mentee_request.select_related('mentee__profile', 'mentor')
+	if pagination.requested(request):
+		return pagination.page_response(request, all_requests, REQUEST_ORDERING, MentorshipReqSerializer)
+
 	serializer = MentorshipReqSerializer(all_requests, many = True)
 
 	return Response(serializer.data, status = HTTP_200_OK)
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@etags.user_etag
 def GetMentorRequests(request):
 	mentor = request.user
 
-	all_requests = mentor.mentor_request.all()
+	all_requests = mentor.mentor_request.select_related('mentee__profile', 'mentor')
+	if pagination.requested(request):
+		return pagination.page_response(request, all_requests, REQUEST_ORDERING, MentorshipReqSerializer)
+
 	serializer = MentorshipReqSerializer(all_requests, many = True)
 
 	return Response({"requests": serializer.data}, status = HTTP_200_OK)
@@ -200,90 +346,97 @@ def UpdateStatus(request, id):
         mentee = mentorship_request.mentee
 
         if status_value == "accepted":
-            Mentorship.objects.create(mentee=mentee, mentor=mentor)
-            Notification.objects.create(
-                user=mentee,
-                text=f"The mentor {mentor.username} has accepted your mentorship request"
-            )
-            Notification.objects.create(
-                user=mentor,
-                text=f"You accepted the mentee {mentee.username}'s request"
-            )
+            Mentorship.objects.get_or_create(mentee=mentee, mentor=mentor)
+            notify(mentee, f"The mentor {mentor.username} has accepted your mentorship request")
+            notify(mentor, f"You accepted the mentee {mentee.username}'s request")
 
         elif status_value == "rejected":
-            Notification.objects.create(
-                user=mentee,
-                text=f"The mentor {mentor.username} has rejected your mentorship request"
-            )
-            Notification.objects.create(
-                user=mentor,
-                text=f"You rejected the mentee {mentee.username}'s request"
-            )
+            notify(mentee, f"The mentor {mentor.username} has rejected your mentorship request")
+            notify(mentor, f"You rejected the mentee {mentee.username}'s request")
 
         # Delete the request regardless of status
         mentorship_request.delete()
+        etags.bump(mentee, mentor)
 
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     except Exception as error:
-        return Response({"error": str(error)}, status=status.HTTP_400_BAD_REQUEST)@api_view(['POST'])
+        return Response({"error": str(error)}, status=status.HTTP_400_BAD_REQUEST)
+
+@api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def ScheduleSession(request):
     """
-    Schedule a mentorship session only if the requested datetime
-    falls within the mentor's availability blocks.
+    Schedule a mentorship session only if the requested window falls
+    within one of the mentor's availability blocks and does not overlap
+    a session the mentor already has booked.
     """
     try:
         data = JSONParser().parse(request)
-        mentorship = get_object_or_404(Mentorship, pk=data.get('id'))
         requested_dt = date_parser.isoparse(data.get('date'))
+        minutes = int(data.get('duration', scheduling.DEFAULT_SESSION_MINUTES))
+        if not 0 < minutes <= scheduling.MAX_SESSION_MINUTES:
+            raise ValueError("duration out of range")
+        start, end = scheduling.session_window(requested_dt, minutes)
     except Exception as e:
         return Response(
             {"detail": "Invalid payload or datetime format."},
             status=status.HTTP_400_BAD_REQUEST
         )
 
-    # Fetch availability blocks for this mentor on that date
-    avail_blocks = Availability.objects.filter(
-        mentor=mentorship.mentor,
-        date=requested_dt.date()
-    )
-
-    # Check if requested datetime fits in any block
-    for block in avail_blocks:
-        start_dt = datetime.combine(block.date, block.start)
-        end_dt   = datetime.combine(block.date, block.end)
-        if start_dt <= requested_dt <= end_dt:
-            # Good: within availability → create session
-            session = Session.objects.create(
-                mentorship=mentorship,
-                date=data.get('date')
+    with transaction.atomic():
+        # Concurrent bookings for this mentor wait here, so each sees the
+        # sessions booked before it
+        if not scheduling.lock_mentor(data.get('id')):
+            return Response({"detail": "Mentorship not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        mentorship = scheduling.mentorship_with_checks(data.get('id'), start, end)
+
+        if not (mentorship.fits or scheduling.fits_recurring(mentorship.mentor, start, end)):
+            return Response(
+                {"detail": "Requested time not within mentor's availability."},
+                status=status.HTTP_400_BAD_REQUEST
             )
-            serializer = SessionSerializer(session)
-            return Response(serializer.data, status=status.HTTP_200_OK)
 
-    # No matching block found → reject
-    return Response(
-        {"detail": "Requested time not within mentor's availability."},
-        status=status.HTTP_400_BAD_REQUEST
-    )
+        if mentorship.clashes:
+            return Response(
+                {"detail": "Requested time overlaps another session of this mentor."},
+                status=status.HTTP_409_CONFLICT
+            )
+
+        session = Session.objects.create(
+            mentorship=mentorship,
+            date=timezone.localtime(start).date(),
+            start=start,
+            end=end
+        )
+
+    etags.bump(mentorship.mentee_id, mentorship.mentor_id)
+    serializer = SessionSerializer(session)
+    return Response(serializer.data, status=status.HTTP_200_OK)
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@etags.user_etag
 def GetMenteeSessions(request):
 		mentee = request.user
-		sessions = Session.objects.filter(mentorship__mentee=mentee)
+		sessions = Session.objects.filter(mentorship__mentee=mentee).select_related('mentorship__mentee', 'mentorship__mentor')
+		if pagination.requested(request):
+			return pagination.page_response(request, sessions, SESSION_ORDERING, SessionSerializer)
 
 		serializer = SessionSerializer(sessions, many = True)
 		return Response({"sessions": serializer.data}, status = status.HTTP_200_OK)
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@etags.user_etag
 def GetMentorSessions(request):
 	try:
 		mentor = request.user
-		sessions = Session.objects.filter(mentorship__mentor=mentor)
+		sessions = Session.objects.filter(mentorship__mentor=mentor).select_related('mentorship__mentee', 'mentorship__mentor')
+		if pagination.requested(request):
+			return pagination.page_response(request, sessions, SESSION_ORDERING, SessionSerializer)
 
 		serializer = SessionSerializer(sessions, many = True)
 		return Response({"sessions": serializer.data}, status = status.HTTP_200_OK)
@@ -314,19 +467,135 @@ def set_availability(request):
 
         if start_time >= end_time:
             return Response({'detail': 'Start time must be before end time.'}, status=400)
+        scheduling.check_availability_date(date_obj)
+
+        # Save it; the bitmap refresh runs in post_save, so a failed refresh
+        # rolls the row back with it
+        with transaction.atomic():
+            Availability.objects.create(
+                mentor=user,
+                date=date_obj,
+                start=start_time,
+                end=end_time,
+            )
+        return Response({'detail': 'Availability block created.'}, status=200)
+
+    except Exception as e:
+        return Response({'detail': f'Invalid input. {str(e)}'}, status=400)
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def bulk_set_availability(request):
+    user = request.user
 
-        # Save it
-        Availability.objects.create(
+    if not user.profile.role == "mentor":
+        return Response({'detail': 'Only mentors can set availability.'}, status=403)
+
+    raw_blocks = request.data.get('blocks')
+    if not isinstance(raw_blocks, list) or not raw_blocks:
+        return Response({'detail': 'blocks must be a non-empty list.'}, status=400)
+    if len(raw_blocks) > MAX_AVAILABILITY_BLOCKS:
+        return Response({'detail': f'At most {MAX_AVAILABILITY_BLOCKS} blocks per request.'}, status=400)
+
+    blocks = []
+    for index, block in enumerate(raw_blocks):
+        try:
+            date_obj = datetime.strptime(block['date'], '%Y-%m-%d').date()
+            start_time = datetime.strptime(block['start'], '%H:%M').time()
+            end_time = datetime.strptime(block['end'], '%H:%M').time()
+            scheduling.check_availability_date(date_obj)
+        except (KeyError, TypeError, ValueError) as e:
+            return Response({'detail': f'Invalid block {index}. {str(e)}'}, status=400)
+
+        if start_time >= end_time:
+            return Response({'detail': f'Invalid block {index}. Start time must be before end time.'}, status=400)
+        blocks.append((date_obj, start_time, end_time))
+
+    created, deleted = scheduling.upsert_availability(user, blocks, replace=bool(request.data.get('replace')))
+    return Response({'detail': 'Availability updated.', 'created': created, 'deleted': deleted}, status=200)
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def set_availability_rule(request):
+    user = request.user
+
+    if not user.profile.role == "mentor":
+        return Response({'detail': 'Only mentors can set availability.'}, status=403)
+
+    data = request.data
+    try:
+        if not (data.get('rrule') and data.get('dtstart') and data.get('start') and data.get('end')):
+            raise ValueError("rrule, dtstart, start and end are required")
+
+        dtstart = datetime.strptime(data['dtstart'], '%Y-%m-%d').date()
+        until = datetime.strptime(data['until'], '%Y-%m-%d').date() if data.get('until') else None
+        start_time = datetime.strptime(data['start'], '%H:%M').time()
+        end_time = datetime.strptime(data['end'], '%H:%M').time()
+        exdates = [datetime.strptime(day, '%Y-%m-%d').date().isoformat() for day in data.get('exdates', [])]
+        rule_text, _ = recurrence.parse_rule(data['rrule'], dtstart)
+
+        if start_time >= end_time:
+            return Response({'detail': 'Start time must be before end time.'}, status=400)
+
+        rule = AvailabilityRule.objects.create(
             mentor=user,
-            date=date_obj,
+            rrule=rule_text,
+            dtstart=dtstart,
+            until=until,
             start=start_time,
             end=end_time,
+            exdates=exdates,
         )
-        return Response({'detail': 'Availability block created.'}, status=200)
+        return Response({'detail': 'Availability rule created.', 'id': rule.id}, status=200)
 
     except Exception as e:
         return Response({'detail': f'Invalid input. {str(e)}'}, status=400)
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def skip_availability_rule(request, id):
+    rule = get_object_or_404(AvailabilityRule, pk=id, mentor=request.user)
+
+    try:
+        day = datetime.strptime(request.data.get('date', ''), '%Y-%m-%d').date().isoformat()
+    except ValueError:
+        return Response({'detail': 'Expected date=YYYY-MM-DD.'}, status=400)
+
+    if day not in rule.exdates:
+        rule.exdates.append(day)
+        rule.save(update_fields=['exdates'])
+
+    return Response({'detail': 'Occurrence skipped.'}, status=200)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def availability_calendar(request):
+    """
+    One-off blocks plus recurring rule occurrences of a mentor between
+    `from` and `to`, with rules expanded only over that window.
+    """
+    profile = get_object_or_404(Profile, pk=request.query_params.get('mentor'))
+
+    try:
+        first_day = datetime.strptime(request.query_params['from'], '%Y-%m-%d').date()
+        last_day = datetime.strptime(request.query_params['to'], '%Y-%m-%d').date()
+    except (KeyError, ValueError):
+        return Response({'detail': 'Expected from/to=YYYY-MM-DD.'}, status=400)
+
+    if not 0 <= (last_day - first_day).days <= recurrence.MAX_WINDOW_DAYS:
+        return Response({'detail': f'Window must span 0 to {recurrence.MAX_WINDOW_DAYS} days.'}, status=400)
+
+    one_off = Availability.objects.filter(
+        mentor_id=profile.user_id, date__range=(first_day, last_day)
+    ).values_list('date', 'start', 'end')
+    recurring = recurrence.blocks(profile.user_id, first_day, last_day)
+
+    data = [
+        {'date': day, 'start': start, 'end': end}
+        for day, start, end in sorted(set(one_off) | set(recurring))
+    ]
+    return Response(data, status=200)
+
 @api_view(['PUT'])
 @permission_classes([IsAuthenticated])
 def SubmitFeedback(request, id):
@@ -347,8 +616,11 @@ def SubmitFeedback(request, id):
 # @permission_classes([IsAuthenticated, IsAdminUser])
 def ListAllUsers(request):
 	try:
-		all_users = User.objects.all()
-		serializer = UserSerializer(all_users, many = True)
+		all_users = User.objects.select_related('profile')
+		if not pagination.all_requested(request):
+			return pagination.page_response(request, all_users, ('id',), UserSerializer)
+
+		serializer = UserSerializer(all_users.order_by('id')[:pagination.MAX_ALL_ROWS], many = True)
 
 		return Response(serializer.data, status = status.HTTP_200_OK)
 
@@ -361,20 +633,132 @@ def UpdateUserRole(request, id):
 	try:
 		user = get_object_or_404(User, pk = id)
 		data = JSONParser().parse(request)
-		serializer = UserSerializer(data, partial = True)
+		role = data.get('role')
+
+		if role not in dict(Profile.roles):
+			return Response({"Error": "Unknown role."}, status = status.HTTP_400_BAD_REQUEST)
+
 		profile = user.profile
+		profile.role = role
+		profile.save(update_fields = ['role'])
+		etags.bump(user)
 
-		profile.role = serializer.data.role
-		return Response(serializer.data, status = status.HTTP_200_OK)
+		return Response(UserSerializer(user).data, status = status.HTTP_200_OK)
 	except Exception as error:
 		return Response({"Error": str(error)}, status = status.HTTP_400_BAD_REQUEST)
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def ListNotifications(request):
+	return pagination.page_response(request, request.user.notifications.all(), ('-date', '-id'), NotificationParser)
+
+async def NotificationStream(request):
+	"""
+	Server-Sent Events stream of the user's new notifications. EventSource
+	cannot send headers, so the access token may also be given as ?token=.
+	"""
+	header = request.headers.get('Authorization', '')
+	raw_token = header.split(' ', 1)[1] if header.startswith('Bearer ') else request.GET.get('token')
+
+	if not raw_token:
+		return JsonResponse({"detail": "Authentication credentials were not provided."}, status = 401)
+
+	try:
+		authenticator = CachedJWTAuthentication()
+		user = await authenticator.aget_user(authenticator.get_validated_token(raw_token))
+	except (InvalidToken, AuthenticationFailed):
+		return JsonResponse({"detail": "Given token not valid."}, status = 401)
+
+	if isinstance(request, ASGIRequest):
+		stream = _notification_events(user.id)
+	elif _wsgi_streams.acquire(blocking = False):
+		stream = _BlockingNotificationStream(user.id)
+	else:
+		response = JsonResponse({"detail": "Too many open notification streams, poll notifications/unread instead."}, status = 503)
+		response['Retry-After'] = str(STREAM_MAX_SECONDS)
+		return response
+
+	response = StreamingHttpResponse(stream, content_type = 'text/event-stream')
+	response['Cache-Control'] = 'no-cache'
+	response['X-Accel-Buffering'] = 'no'
+	return response
+
+def _event(message):
+	return f"event: notification\nid: {message['id']}\ndata: {json.dumps(message)}\n\n"
+
+async def _notification_events(user_id):
+	broker = events.get_broker()
+	queue = broker.subscribe(user_id)
+	try:
+		yield ': connected\n\n'
+		while True:
+			try:
+				message = await asyncio.wait_for(queue.get(), STREAM_KEEPALIVE_SECONDS)
+			except asyncio.TimeoutError:
+				yield ': keep-alive\n\n'
+				continue
+			yield _event(message)
+	finally:
+		broker.unsubscribe(user_id, queue)
+
+class _BlockingNotificationStream:
+	"""
+	The stream for a WSGI worker thread. WSGI reads an async iterator to the
+	end before sending anything, so this blocks on the broker instead and
+	ends after STREAM_MAX_SECONDS. The response closes it, which frees its
+	slot in _wsgi_streams.
+	"""
+
+	def __init__(self, user_id):
+		self.user_id = user_id
+		self.events = self._events()
+
+	def __iter__(self):
+		return self.events
+
+	def _events(self):
+		broker = events.get_broker()
+		subscription = broker.subscribe(self.user_id, blocking = True)
+		deadline = monotonic() + STREAM_MAX_SECONDS
+		try:
+			yield ': connected\n\n'
+			while (remaining := deadline - monotonic()) > 0:
+				try:
+					message = subscription.get(timeout = min(STREAM_KEEPALIVE_SECONDS, remaining))
+				except Empty:
+					yield ': keep-alive\n\n'
+					continue
+				yield _event(message)
+		finally:
+			broker.unsubscribe(self.user_id, subscription)
+
+	def close(self):
+		self.events.close()
+		_wsgi_streams.release()
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def UnreadNotifications(request):
+	unread = Profile.objects.filter(user = request.user).values_list('unread_notifications', flat = True).first()
+	return Response({"unread": unread or 0}, status = status.HTTP_200_OK)
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def MarkNotificationsSeen(request):
+	ids = request.data.get('ids')
+	if ids is not None and not (
+		isinstance(ids, list) and all(isinstance(pk, int) and not isinstance(pk, bool) for pk in ids)
+	):
+		return Response({"detail": "ids must be a list of notification ids."}, status = status.HTTP_400_BAD_REQUEST)
+
+	changed = notifications.mark_seen(request.user, ids)
+	return Response({"seen": changed}, status = status.HTTP_200_OK)
+
 @api_view(['DELETE'])
 @permission_classes([IsAuthenticated])
 def DeleteNotifications(request):
 	try:
-		user = request.user
-		user.notifications.all().delete()
+		notifications.delete_all(request.user)
 
 		return Response({"done": "successfully deleted all"}, status = status.HTTP_200_OK)
 	except Exception as error:
@@ -383,7 +767,7 @@ def DeleteNotifications(request):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def my_mentorships(request):
-    mentorships = Mentorship.objects.filter(mentee=request.user)
+    mentorships = Mentorship.objects.filter(mentee=request.user).select_related('mentor')
 
     # Optional: enrich the data with mentor username
     data = []
@@ -399,6 +783,9 @@ def my_mentorships(request):
 @api_view(['POST'])
 @permission_classes([IsAuthenticated, IsAdminUser])
 def ManualMatch(request):
+	if request.data.get('mode') == 'auto':
+		return AutoMatch(request)
+
 	mentee_id = request.data.get('mentee_id')
 	mentor_id = request.data.get('mentor_id')
 
@@ -408,32 +795,70 @@ def ManualMatch(request):
 	mentee = mentee_profile.user
 	mentor = mentor_profile.user
 
-	Mentorship.objects.create(
+	_, created = Mentorship.objects.get_or_create(
 		mentee = mentee,
 		mentor = mentor
 	)
+	if not created:
+		return Response({"detail": "These users are already matched."}, status = status.HTTP_409_CONFLICT)
 
-	Notification.objects.create(
-		user = mentee,
-		text = f"The admin user {request.user.username} matched you with the mentor {mentor.username}"
-	)
+	notify(mentee, f"The admin user {request.user.username} matched you with the mentor {mentor.username}")
 
-	Notification.objects.create(
-		user = mentor,
-		text = f"The admin user {request.user.username} matched you with {mentee.username}"
-	)
+	notify(mentor, f"The admin user {request.user.username} matched you with {mentee.username}")
 
-	Notification.objects.create(
-		user = request.user,
-		text = f"You mathced the mentee {mentee.username} with the mentor {mentor.username}"
-	)
+	notify(request.user, f"You mathced the mentee {mentee.username} with the mentor {mentor.username}")
 
 	return Response({"details": "Sucessfully matched"}, status = HTTP_200_OK)
 
+def AutoMatch(request):
+	from . import matching
+
+	capacity = request.data.get('capacity')
+
+	if capacity is not None:
+		try:
+			capacity = int(capacity)
+		except (TypeError, ValueError):
+			return Response({"detail": "capacity must be an integer."}, status = status.HTTP_400_BAD_REQUEST)
+
+	try:
+		pairs = matching.auto_match(request.user, capacity)
+	except IntegrityError:
+		return Response({"detail": "Some of these pairs were matched meanwhile, try again."}, status = status.HTTP_409_CONFLICT)
+
+	return Response({
+		"details": f"Sucessfully matched {len(pairs)} mentees",
+		"matches": [{"mentee": mentee, "mentor": mentor} for mentee, mentor in pairs]
+	}, status = HTTP_200_OK)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsAdminUser])
+def ExportTable(request, table, fmt):
+	from . import exports
+
+	if table not in exports.EXPORTS or fmt not in exports.CONTENT_TYPES:
+		return Response({"detail": "Unknown export."}, status = status.HTTP_404_NOT_FOUND)
+
+	response = StreamingHttpResponse(exports.stream(table, fmt), content_type = exports.CONTENT_TYPES[fmt])
+	response['Content-Disposition'] = f'attachment; filename="{table}.{fmt}"'
+	return response
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsAdminUser])
+def Metrics(request):
+	"""Point-in-time counters for this worker process."""
+	return Response({
+		"login": login_pool.metrics(),
+		"database": {alias: pool.metrics() for alias, pool in db_pools().items()},
+	}, status = HTTP_200_OK)
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated, IsAdminUser])
 def GetAllSessions(request):
-	all_sessions = Session.objects.all()
-	serializer = SessionSerializer(all_sessions, many = True)
+	all_sessions = Session.objects.select_related('mentorship__mentee', 'mentorship__mentor')
+	if not pagination.all_requested(request):
+		return pagination.page_response(request, all_sessions, SESSION_ORDERING, SessionSerializer)
+
+	serializer = SessionSerializer(all_sessions.order_by(*SESSION_ORDERING)[:pagination.MAX_ALL_ROWS], many = True)
 
 	return Response(serializer.data, status = HTTP_200_OK)
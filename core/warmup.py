@@ -0,0 +1,64 @@
+import logging
+import os
+
+from django.apps import apps
+from django.contrib.auth.hashers import get_hasher
+from django.db import DatabaseError, connections
+from django.template.loader import get_template
+from django.urls import get_resolver
+
+from rest_framework.serializers import BaseSerializer
+
+from . import serializers, directory
+from .db.pool import pools
+
+logger = logging.getLogger(__name__)
+
+def _patterns(resolver):
+    for pattern in resolver.url_patterns:
+        if hasattr(pattern, 'url_patterns'):
+            yield from _patterns(pattern)
+        else:
+            yield pattern
+
+def _serializer_classes():
+    for value in vars(serializers).values():
+        if isinstance(value, type) and issubclass(value, BaseSerializer) and value.__module__ == serializers.__name__:
+            yield value
+
+def warm():
+    """
+    Do the one-off work the first requests would otherwise pay for: compile
+    every URL pattern, load templates, build model and serializer metadata
+    and fill the mentor directory cache. Run in the gunicorn master before
+    forking so workers inherit all of it copy-on-write.
+    """
+    resolver = get_resolver()
+    for pattern in _patterns(resolver):
+        # Compiled lazily on first access, then cached on the pattern
+        pattern.pattern.regex
+    resolver.resolve('/')
+
+    templates = os.path.join(apps.get_app_config('core').path, 'templates')
+    for name in sorted(os.listdir(templates)):
+        if name.endswith('.html'):
+            get_template(name)
+
+    for model in apps.get_models():
+        model._meta.get_fields()
+    for serializer_class in _serializer_classes():
+        serializer_class().fields
+
+    get_hasher('default')
+
+    try:
+        directory.rebuild()
+    except DatabaseError:
+        # Not fatal: e.g. before the first migrate. Readers rebuild on a miss.
+        logger.warning("Skipped warming the mentor directory", exc_info = True)
+    finally:
+        # Forked workers must not share the master's database connections,
+        # pooled ones included
+        connections.close_all()
+        for pool in pools().values():
+            pool.close_all()
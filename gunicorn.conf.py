@@ -0,0 +1,57 @@
+"""
+Gunicorn settings, picked up automatically from the project root.
+
+Every value can be overridden from the environment; the defaults scale with
+the CPUs the container may use, within its database connection budget.
+"""
+import os
+import resource
+
+# CPUs this process may run on; cpu_count() reports the whole host
+try:
+    cores = len(os.sched_getaffinity(0))
+except AttributeError:
+    cores = os.cpu_count() or 1
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+
+# Threads overlap database and client I/O; one per pooled connection, as
+# more would only wait for the pool
+pool_size = int(os.getenv("DB_POOL_SIZE", "4"))
+threads = int(os.getenv("GUNICORN_THREADS", pool_size or 4))
+
+# Processes for CPU-bound work follow the cores, capped so every worker's
+# connections (the pool, or one per thread without it) fit in
+# DB_MAX_CONNECTIONS, which should sit below the server's max_connections
+connection_budget = int(os.getenv("DB_MAX_CONNECTIONS", "80"))
+max_workers = max(1, connection_budget // (pool_size or threads))
+workers = int(os.getenv("GUNICORN_WORKERS", os.getenv("WEB_CONCURRENCY", min(2 * cores + 1, max_workers))))
+worker_class = "gthread" if threads > 1 else "sync"
+
+# Import and warm the app once in the master; workers share it copy-on-write
+preload_app = True
+
+# Recycle workers regularly, jittered so they don't all restart together,
+# and early once one grows past GUNICORN_MAX_WORKER_MEMORY_MB
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "2000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "200"))
+max_worker_memory_mb = int(os.getenv("GUNICORN_MAX_WORKER_MEMORY_MB", "512"))
+
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
+graceful_timeout = 30
+keepalive = 5
+
+accesslog = "-"
+
+def when_ready(server):
+    from core.warmup import warm
+
+    warm()
+    server.log.info("Warmed application before forking %s workers", workers)
+
+def post_request(worker, req, environ, resp):
+    # ru_maxrss is in KiB on Linux
+    rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    if worker.alive and rss_mb > max_worker_memory_mb:
+        worker.log.info("Worker %s reached %d MiB, restarting", worker.pid, rss_mb)
+        worker.alive = False
@@ -1,2 +1,3 @@
 echo "🚀 Starting Gunicorn..."
-gunicorn backend.wsgi:application
+# Workers, threads, preloading and warmup come from gunicorn.conf.py
+gunicorn backend.wsgi:application -c gunicorn.conf.py